@@ -3,6 +3,7 @@ import copy
 import functools
 import importlib
 import inspect
+import itertools
 import operator
 import os
 import random
@@ -508,28 +509,109 @@ _always_allowed_to_import = [
     "_io",          # Python3.8 >= imports this along with the module that was imported
 ]
 
+# Matches integers, decimals and numbers such as +1, 2e9, +2E+09, -2.0e-9
+_number_pattern = re.compile(r"[-+]?\d+(?:\.\d+)?(?:[Ee][+-]?\d+)?")
+
+# Match the definition and the module-level call of main() in _find_main_func_and_call
+_main_func_pattern = re.compile(r"^def\s+main\s*\(.*\)\s*:\s*$", re.MULTILINE)
+_main_call_pattern = re.compile(r"^main\s*\(.*\)\s*$", re.MULTILINE)
+
+# Layouts of the feedback given for exceptions in IOTester._raise_exception_with_feedback
+_FEEDBACK_FULL = "full" # Messages with the tested function, description, diff and used inputs and parameters
+_FEEDBACK_PROGRAM = "program" # Messages with the tested function, description and used inputs and parameters
+_FEEDBACK_NAME = "name" # Messages with the tested function
+_FEEDBACK_SHORT = "short" # Messages only
+
+# Feedback for exceptions that always get the same message, by exception class name:
+# (function returning the message, feedback layout, hide traceback).
+# The messages are read when the exception is handled, so replacing the constants is taken into account.
+_exception_messages = {
+    "GraderIOError": (lambda: MSG_GRADER_BUFFER, _FEEDBACK_FULL, True),
+    "TimeoutError": (lambda: MSG_TIMEOUTERROR, _FEEDBACK_FULL, False),
+    "MainCallNotFoundError": (lambda: MSG_MAIN_CALL_NOT_FOUND, _FEEDBACK_NAME, True),
+    "ImportError": (lambda: MSG_IMPORTERROR, _FEEDBACK_FULL, False),
+    "SystemExit": (lambda: MSG_SYSTEMEXIT, _FEEDBACK_PROGRAM, True),
+    "KeyboardInterrupt": (lambda: MSG_KEYBOARDINTERRUPT, _FEEDBACK_PROGRAM, True),
+    "AttributeError": (lambda: MSG_ATTRIBUTEERROR, _FEEDBACK_FULL, False),
+    "NameError": (lambda: MSG_NAMEERROR, _FEEDBACK_FULL, False),
+    "ZeroDivisionError": (lambda: MSG_ZERODIVISIONERROR, _FEEDBACK_FULL, False),
+    "TypeError": (lambda: MSG_TYPEERROR, _FEEDBACK_FULL, False),
+    "RecursionError": (lambda: MSG_RECURSIONERROR, _FEEDBACK_FULL, False),
+    "UnicodeDecodeError": (lambda: MSG_UNICODEDECODEERROR, _FEEDBACK_SHORT, True),
+    "SyntaxError": (lambda: MSG_SYNTAXERROR, _FEEDBACK_SHORT, False),
+    "IndentationError": (lambda: MSG_INDENTATIONERROR, _FEEDBACK_SHORT, False),
+    "TabError": (lambda: MSG_TABERROR, _FEEDBACK_SHORT, False),
+    "KeyError": (lambda: MSG_KEYERROR, _FEEDBACK_FULL, False),
+}
+
+# Translation table for replacing non-breaking spaces and escaping null characters in captured output
+_output_translation_table = str.maketrans({'\xa0': ' ', '\x00': r"\x00"})
+
+# Translation table for escaping HTML characters in a single pass
+_html_escape_table = str.maketrans({
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    " ": "&nbsp;",
+})
+
 
 def _combine_feedback(strings=[]):
-    feedback = ""
-    add_separator = False
-    for string in strings:
-        if len(string) > 0:
-            if add_separator:
-                feedback += "\n{:s}\n".format(SEPARATOR)
-            feedback += string
-            add_separator = True
-    return feedback
+    # Join the non-empty strings with a separator between each of them
+    return ("\n" + SEPARATOR + "\n").join([string for string in strings if len(string) > 0])
+
+
+# Keyed by the placeholders, so replacing the IOTESTER_NO_ESCAPE_* constants is still taken into account
+@functools.lru_cache(maxsize=None)
+def _get_no_escape_replacer(no_escape_lt, no_escape_gt, no_escape_nbsp):
+    """
+    Return a function that replaces the placeholders for characters that are inserted
+    into the HTML unescaped.
+    """
+    replacements = {
+        no_escape_lt: "<",
+        no_escape_gt: ">",
+        no_escape_nbsp: " ",
+    }
+    pattern = re.compile('|'.join(re.escape(p) for p in replacements))
+    return functools.partial(pattern.sub, lambda match: replacements[match.group(0)])
+
+
+# Keyed by the markers, so replacing the IOTESTER_* and ENTER_STRING constants is still taken into account
+@functools.lru_cache(maxsize=None)
+def _get_input_echo_parts(input_begin, input_end, no_escape_lt, no_escape_gt, no_escape_nbsp, enter_string):
+    """
+    Return the line written to the output in place of an empty input line and the strings written
+    before and after other input lines (see IOTester._iotester_input).
+    """
+    input_enter_line = "{0}{4}{2}br{3}{1}".format(
+        input_begin,
+        input_end,
+        no_escape_lt,
+        no_escape_gt,
+        enter_string,
+    )
+    input_line_begin = '{0}{2}span{4}class="iotester-input"{3}'.format(
+        input_begin,
+        input_end,
+        no_escape_lt,
+        no_escape_gt,
+        no_escape_nbsp,
+    )
+    input_line_end = '{2}/span{3}{2}br{3}{1}'.format(
+        input_begin,
+        input_end,
+        no_escape_lt,
+        no_escape_gt,
+    )
+    return input_enter_line, input_line_begin, input_line_end
 
 
 def _escape_html_chars(string):
-    escaped_string = string.replace("&", "&amp;")
-    escaped_string = escaped_string.replace("<", "&lt;")
-    escaped_string = escaped_string.replace(">", "&gt;")
-    escaped_string = escaped_string.replace(" ", "&nbsp;")
-    escaped_string = escaped_string.replace(IOTESTER_NO_ESCAPE_LT, "<")
-    escaped_string = escaped_string.replace(IOTESTER_NO_ESCAPE_GT, ">")
-    escaped_string = escaped_string.replace(IOTESTER_NO_ESCAPE_NBSP, " ")
-    return escaped_string
+    escaped_string = string.translate(_html_escape_table)
+    # The placeholders do not contain any escaped characters, so they can be replaced after escaping
+    replace_no_escape = _get_no_escape_replacer(IOTESTER_NO_ESCAPE_LT, IOTESTER_NO_ESCAPE_GT, IOTESTER_NO_ESCAPE_NBSP)
+    return replace_no_escape(escaped_string)
 
 
 # Customized diff_prettyHtml from diff_match_patch
@@ -551,12 +633,36 @@ def _diff_prettyHtml(dmp, diffs, type, hide_newlines):
     return diff_html
 
 
-def _get_diff_html(output, expected_output, type, hide_newlines):
+def _diffs_to_html(dmp, diffs, hide_newlines):
+    # Return the HTML of diffs for the output and the expected output side
+    delete_html = _diff_prettyHtml(dmp, diffs, "delete", hide_newlines)
+    if all(op == dmp.DIFF_EQUAL for op, _ in diffs):
+        # Both sides are rendered the same when the texts are equal, which is the case in passing tests
+        return delete_html, delete_html
+    return delete_html, _diff_prettyHtml(dmp, diffs, "insert", hide_newlines)
+
+
+def _remove_last_br(diff_html):
+    # Find the end of the trimmed string first so that the string is copied at most once
+    end = len(diff_html)
+    if diff_html.endswith("<br>"):
+        end -= 4
+    if end >= 11 and diff_html[end - 11:end - 7] == "<br>":
+        return diff_html[:end - 11] + diff_html[end - 7:end]
+    return diff_html[:end]
+
+
+def _get_diff_html(output, expected_output, hide_newlines):
+    """
+    Return a pair of HTML strings (output diff, expected output diff).
+    The diffs are computed once and rendered for both sides.
+    """
     dmp = diff_match_patch()
     dmp.Match_Threshold = 0.0
     dmp.Match_Distance = 0
     dmp.Patch_DeleteThreshold = 0.0
-    diff_html = ""
+    delete_parts = []
+    insert_parts = []
     output_split = output.split(IOTESTER_INPUT_END)
     expected_output_split = expected_output.split(IOTESTER_INPUT_END)
     for i in range(len(output_split)):
@@ -573,44 +679,67 @@ def _get_diff_html(output, expected_output, type, hide_newlines):
             expected_output_before = expected_part_split[0]
             diffs = dmp.diff_main(output_before, expected_output_before)
             dmp.diff_cleanupSemantic(diffs)
-            diff_html += _diff_prettyHtml(dmp, diffs, type, hide_newlines)
-            if type == "delete":
-                inputs = part_split[1]
-                inputs = _escape_html_chars(inputs)
-                diff_html += inputs
-            elif type == "insert" and len(expected_part_split) == 2:
+            delete_html, insert_html = _diffs_to_html(dmp, diffs, hide_newlines)
+            delete_parts.append(delete_html)
+            insert_parts.append(insert_html)
+            inputs = part_split[1]
+            inputs = _escape_html_chars(inputs)
+            delete_parts.append(inputs)
+            if len(expected_part_split) == 2:
                 expected_inputs = expected_part_split[1]
                 expected_inputs = _escape_html_chars(expected_inputs)
-                diff_html += expected_inputs
+                insert_parts.append(expected_inputs)
         else:
             output_after = part_split[0]
-            expected_output_after = (
-                ''.join(expected_output_split[i:])
-                    .replace(IOTESTER_INPUT_BEGIN, '')
-                    .replace(IOTESTER_INPUT_END, '')
-            )
+            # The parts no longer contain IOTESTER_INPUT_END after splitting
+            expected_output_after = ''.join(expected_output_split[i:]).replace(IOTESTER_INPUT_BEGIN, '')
             diffs = dmp.diff_main(output_after, expected_output_after)
             dmp.diff_cleanupSemantic(diffs)
-            diff_html += _diff_prettyHtml(dmp, diffs, type, hide_newlines)
+            delete_html, insert_html = _diffs_to_html(dmp, diffs, hide_newlines)
+            delete_parts.append(delete_html)
+            insert_parts.append(insert_html)
 
     # Remove last <br>
-    if diff_html.endswith("<br>"):
-        diff_html = diff_html[:-4]
-    if len(diff_html) >= 11 and diff_html[-11:-7] == "<br>":
-        diff_html = diff_html[:-11] + diff_html[-7:]
-
-    return diff_html
+    return _remove_last_br(''.join(delete_parts)), _remove_last_br(''.join(insert_parts))
 
 
+# complete_output_test parses the same outputs in text_test, numbers_test and the whitespace check
+@functools.lru_cache(maxsize=16)
 def _get_numbers_from_string(string):
     """
-    Return a list of numbers (strings) that appear in parameter string.
+    Return a tuple of numbers (strings) that appear in parameter string.
     Match integers, decimals and numbers such as +1, 2e9, +2E+09, -2.0e-9.
     """
-    numbers = re.findall(r"[-+]?(?:(?:\d+\.\d+)|(?:\d+))(?:[Ee][+-]?\d+)?", string)
+    numbers = tuple(_number_pattern.findall(string))
     return numbers
 
 
+@functools.lru_cache(maxsize=None)
+def _get_chars_to_skip(ignored_characters, strip_whitespace):
+    """
+    Return a tuple of the characters that _strip_string removes and a str.translate table
+    that deletes them. The table is None if there are strings that are not single characters,
+    since those cannot be deleted with str.translate.
+    Cached since the ignored characters only change when the settings change.
+    """
+    chars_to_skip = ignored_characters
+    if strip_whitespace:
+        chars_to_skip += (' ', '\n')
+    if all(len(char) == 1 for char in chars_to_skip):
+        return chars_to_skip, str.maketrans('', '', ''.join(chars_to_skip))
+    return chars_to_skip, None
+
+
+def _remove_chars(string, chars, deletion_table):
+    if deletion_table is not None:
+        # Delete all characters in a single pass
+        return string.translate(deletion_table)
+    for char in chars:
+        if char in string:
+            string = string.replace(char, '')
+    return string
+
+
 def _strip_string(
         string,
         numbers,
@@ -619,40 +748,43 @@ def _strip_string(
         strip_whitespace,
         minus_check_indexes=[],
         ):
-    chars_to_skip = ignored_characters.copy()
-    if strip_whitespace:
-        chars_to_skip.extend([' ', '\n'])
-    stripped_string = ""
-    for i in range(len(numbers)):
-        s = 0
-        e = len(numbers[i])
-        while string[s:e] != numbers[i]:
-            s += 1
-            e += 1
-        substring = string[0:s]
-        for char in chars_to_skip:
-            if char in substring:
-                substring = substring.replace(char, '')
-        stripped_string += substring
+    chars_to_skip, deletion_table = _get_chars_to_skip(tuple(ignored_characters), strip_whitespace)
+    if not numbers and not chars_to_skip:
+        # Nothing to strip or replace
+        return string
+    # The parts of the stripped string are joined once at the end
+    parts = []
+    minus_check_indexes = set(minus_check_indexes)
+    # Position in string after the previous number.
+    # The numbers are in the order they appear in string, so each one is searched for starting from here.
+    pos = 0
+    for i, number in enumerate(numbers):
+        s = string.find(number, pos)
+        parts.append(_remove_chars(string[pos:s], chars_to_skip, deletion_table))
         if not strip_numbers:
             if i in minus_check_indexes:
-                stripped_string += IOTESTER_MINUS_CHECK
+                parts.append(IOTESTER_MINUS_CHECK)
             else:
-                stripped_string += IOTESTER_NUMBER
-        string = string[e:]
-    if string != "":
-        substring = string
-        for char in chars_to_skip:
-            if char in substring:
-                substring = substring.replace(char, '')
-        stripped_string += substring
-    return stripped_string
+                parts.append(IOTESTER_NUMBER)
+        pos = s + len(number)
+    if pos < len(string):
+        parts.append(_remove_chars(string[pos:], chars_to_skip, deletion_table))
+    return ''.join(parts)
+
+
+# Keyed by the placeholder, so replacing IOTESTER_MINUS_CHECK is still taken into account
+@functools.lru_cache(maxsize=None)
+def _get_minus_check_pattern(minus_check):
+    """
+    Return a regex that matches a minus check placeholder together with the whitespace around it.
+    """
+    return re.compile(r"(\s*" + re.escape(minus_check) + r"\s*)")
 
 
 def _whitespace_minus_check_patch(string1, string2):
-    pattern = re.compile("(\s*" + re.escape(IOTESTER_MINUS_CHECK) + "\s*)")
-    match1 = re.findall(pattern, string1)
-    match2 = re.findall(pattern, string2)
+    minus_check_pattern = _get_minus_check_pattern(IOTESTER_MINUS_CHECK)
+    match1 = minus_check_pattern.findall(string1)
+    match2 = minus_check_pattern.findall(string2)
     for i in range(len(match1)):
         if match2[i].count(' ') - match1[i].count(' ') in [-1, 0, 1]:
             string1 = string1.replace(match1[i], match2[i])
@@ -679,16 +811,216 @@ def _inputs_to_str(inputs=[]):
 
 
 def _params_to_str(args=(), kwargs={}):
-    params = []
-    for arg in args:
-        params.append(repr(arg))
-    for key, value in kwargs.items():
-        params.append(str(key) + '=' + repr(value))
-    params_str = ", ".join(params)
+    params_str = ", ".join(itertools.chain(
+        (repr(arg) for arg in args),
+        (str(key) + '=' + repr(value) for key, value in kwargs.items()),
+    ))
     params_str = _escape_html_chars(params_str)
     return params_str
 
 
+_memory_address_pattern = re.compile(" at 0x[0123456789abcdef]+")
+
+
+def _return_value_to_str(return_value):
+    # Strip memory address information
+    return _memory_address_pattern.sub('', repr(return_value))
+
+
+# How return_value_test compares values of the built-in types, by exact type
+_compare_kinds = {
+    bool: "equal",
+    str: "equal",
+    int: "int",
+    float: "float",
+    list: "sequence",
+    tuple: "sequence",
+    set: "set",
+    dict: "dict",
+}
+
+
+def _compare_kind(value):
+    # Return how value is compared in return_value_test, or None if it is not one of the compared types
+    kind = _compare_kinds.get(type(value))
+    if kind is not None:
+        return kind
+    # Instances of subclasses are compared like instances of their base classes
+    if isinstance(value, (bool, str)):
+        return "equal"
+    elif isinstance(value, int):
+        return "int"
+    elif isinstance(value, float):
+        return "float"
+    elif isinstance(value, (list, tuple)):
+        return "sequence"
+    elif isinstance(value, set):
+        return "set"
+    elif isinstance(value, dict):
+        return "dict"
+    return None
+
+
+# Marks a key of an expected dict that is missing from the returned dict
+_missing_key = object()
+
+
+def _compare_return_values(test_case, return_value, expected_return_value, max_int_delta, max_float_delta):
+    """
+    Compare a return value to the expected return value with the assert methods of test_case.
+    Nested elements are compared depth-first using a stack instead of recursion.
+    """
+    assert_equal = test_case.assertEqual
+    assert_almost_equal = test_case.assertAlmostEqual
+    stack = [(return_value, expected_return_value)]
+    while stack:
+        elem1, elem2 = stack.pop()
+        if elem1 is _missing_key:
+            test_case.fail(MSG_RETURN_VALUE)
+        # Check that return values are of the same type.
+        # The __class__ attribute is used because type() returns rpyc.core.netref.type when using rpyc.
+        # Calling repr() below allows elements to be from different modules.
+        assert_equal(repr(elem1.__class__), repr(elem2.__class__))
+        kind = _compare_kind(elem2)
+        if kind == "equal":
+            assert_equal(elem1, elem2)
+        elif kind == "int":
+            assert_almost_equal(elem1, elem2, delta=max_int_delta)
+        elif kind == "float":
+            assert_almost_equal(elem1, elem2, delta=max_float_delta)
+        elif kind == "sequence":
+            assert_equal(len(elem1), len(elem2))
+            # Push in reverse so that the elements are compared in order
+            stack.extend([(elem1[i], elem2[i]) for i in range(len(elem2) - 1, -1, -1)])
+        elif kind == "set":
+            assert_equal(len(elem1), len(elem2))
+            diff1 = elem2.difference(elem1)
+            assert_equal(len(diff1), 0)
+            diff2 = elem1.difference(elem2)
+            assert_equal(len(diff2), 0)
+        elif kind == "dict":
+            assert_equal(len(elem1), len(elem2))
+            # A single get() per key, which is also a single request when elem1 is an rpyc netref
+            items = [(elem1.get(key, _missing_key), value) for key, value in elem2.items()]
+            items.reverse()
+            stack.extend(items)
+        elif isinstance(elem2, type):
+            assert_equal(repr(elem1), repr(elem2))
+        else:
+            # Compare other objects
+            pass
+
+
+def _attr_types_to_str(attrs_dict, class_name):
+    # Return the attributes and the types of their values sorted by name, without the name mangling of private attributes
+    mangled_prefix = "_" + class_name + "__"
+    attrs_list = []
+    for key in sorted(attrs_dict.keys()):
+        value = attrs_dict[key]
+        if key.startswith(mangled_prefix):
+            key = key[len(class_name) + 1:]
+        attrs_list.append(key + " : " + repr(type(value)))
+    return '\n'.join(attrs_list)
+
+
+def _attr_values_to_str(attrs_dict, class_name):
+    # Return the attributes and their values sorted by name, without the name mangling of private attributes
+    mangled_prefix = "_" + class_name + "__"
+    attrs_list = []
+    for key in sorted(attrs_dict.keys()):
+        value = attrs_dict[key]
+        if key.startswith(mangled_prefix):
+            key = key[len(class_name) + 1:]
+        attrs_list.append(key + " = " + repr(value))
+    return '\n'.join(attrs_list)
+
+
+def _get_extra_attrs(student_dict, model_dict, class_name):
+    # Return a list of the attributes in student_dict that are not in model_dict and their HTML-escaped description
+    mangled_prefix = "_" + class_name + "__"
+    # Checked against the dict instead of a list of its keys, keeping the order of student_dict
+    extra_list = [key for key in student_dict if key not in model_dict]
+    extra_parts = []
+    for key in extra_list:
+        value = student_dict[key]
+        if key.startswith(mangled_prefix):
+            key = key[len(class_name) + 1:]
+        extra_parts.append("\n{:s} : {:s}".format(repr(key), repr(type(value))))
+    extra_str = _escape_html_chars(''.join(extra_parts))
+    return extra_list, extra_str
+
+
+# Types whose values cannot be modified, so they do not need to be copied
+_immutable_types = frozenset([int, float, complex, bool, str, bytes, type(None)])
+
+
+def _copy_params(params):
+    """
+    Return a copy of the args tuple or kwargs dict that the tested code cannot modify.
+    Skip copy.deepcopy and its memo when all the values are of immutable types, which is the usual case.
+    """
+    if type(params) is tuple:
+        if all(type(value) in _immutable_types for value in params):
+            return params
+    elif type(params) is dict:
+        if all(type(value) in _immutable_types for value in params.values()):
+            return params.copy()
+    return copy.deepcopy(params)
+
+
+def _find_line(string, prefix, start):
+    # Return the index where the first line at or after the line beginning at index start
+    # that starts with prefix begins, or -1 if there is no such line
+    if string.startswith(prefix, start):
+        return start
+    i = string.find("\n" + prefix, start)
+    if i != -1:
+        return i + 1
+    return -1
+
+
+def _read_line(string, start):
+    # Return the line beginning at index start including its newline, like StringIO.readline,
+    # and the index where the next line begins
+    end = string.find("\n", start)
+    end = len(string) if end == -1 else end + 1
+    return string[start:end], end
+
+
+# Patterns matching everything up to and including the beginning of the last line
+# that starts with an exception name, used to clean rpyc tracebacks.
+# The line boundaries are the same as in str.splitlines().
+_message_line_patterns = {
+    name: re.compile(r"(?s:.*)(?:\A|[\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029])(?=" + name + ":)")
+    for name in ["ModuleNotFoundError", "FileNotFoundError", "EOFError", "UnboundLocalError"]
+}
+
+
+def _find_last_line(string, exception_name):
+    # Return the index where the last line that starts with exception_name begins, or -1 if there is no such line
+    match = _message_line_patterns[exception_name].match(string)
+    return match.end() if match else -1
+
+
+def _py_module_names(*dirs):
+    # Yield the names of the Python modules in dirs
+    for dir in dirs:
+        with os.scandir(dir) as entries:
+            for entry in entries:
+                root, ext = os.path.splitext(entry.name)
+                if ext == ".py":
+                    yield root
+
+
+def _dir_contains(dir, name):
+    # Check if there is a file or directory called name in dir
+    with os.scandir(dir) as entries:
+        for entry in entries:
+            if entry.name == name:
+                return True
+    return False
+
+
 def _verify_permissions(name, whitelist, blacklist):
     # Check if name is allowed to be imported/opened
     whitelist_enabled = bool(whitelist)
@@ -701,15 +1033,49 @@ def _verify_permissions(name, whitelist, blacklist):
     return allowed
 
 
+# Results of _find_main_func_and_call by (path, size, modification time) of the parsed student module.
+# Only files that were read and parsed without errors are stored, so the exceptions are always new.
+_main_func_and_call_cache = {}
+
+# Results of class_str_call_test by (path, size, modification time) of the parsed student module
+_str_call_cache = {}
+
+# File modes that _iotester_open treats as reading and as writing
+_open_read_modes = ("r", "rt", "rb")
+_open_write_modes = (
+    "x", "xt", "xb", "x+", "xt+", "xb+",
+    "w", "wt", "wb", "w+", "wt+", "wb+",
+    "a", "at", "ab", "a+", "at+", "ab+",
+    "r+", "rt+", "rb+"
+)
+
+# Compiled code of imported model modules by path, stored with the modification time and size of the file
+_model_code_cache = {}
+
+
+# Keyed by model_path too, so reassigning iotester.model_path is still taken into account
+@functools.lru_cache(maxsize=64)
+def _model_module_path(model_path, module_name):
+    return os.path.join(model_path, module_name + ".py")
+
+
 def _get_import(module_name, model):
     if model:
         # Inserting model_path to sys.path allows the model to import other modules from model_path
         sys.path.insert(0, model_path)
         # Using spec so model answer can be imported from model_path
-        path = os.path.join(model_path, module_name + ".py")
+        path = _model_module_path(model_path, module_name)
         spec = importlib.util.spec_from_file_location(module_name, path)
         module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
+        # Model modules are re-imported for every test, so the compiled code is reused
+        # as long as the file has not been modified.
+        stat = os.stat(path)
+        mtime_and_size = (stat.st_mtime_ns, stat.st_size)
+        cached = _model_code_cache.get(path)
+        if cached is None or cached[0] != mtime_and_size:
+            cached = (mtime_and_size, spec.loader.get_code(module_name))
+            _model_code_cache[path] = cached
+        exec(cached[1], module.__dict__)
     else:
         # Rpyc does not execute student answer in a separate process when using spec like above.
         # This imports student answer from student_path using rpyc.
@@ -744,12 +1110,21 @@ class LimitedBuffer(StringIO):
     def __init__(self, buffer=None, max_size=100000):
         super().__init__(buffer)
         self.max_size = max_size
+        # Stream position tracked here so that write() does not need to call tell()
+        self._position = 0
+
+
+    def seek(self, *args):
+        self._position = StringIO.seek(self, *args)
+        return self._position
 
 
     def write(self, string):
-        if self.tell() + len(string) > self.max_size:
+        if self._position + len(string) > self.max_size:
             raise GraderIOError(MSG_GRADER_BUFFER)
-        return StringIO.write(self, string)
+        written = StringIO.write(self, string)
+        self._position += written
+        return written
 
 
 class IOTester:
@@ -761,6 +1136,13 @@ class IOTester:
         # Maximum program execution time in seconds (stops test in case of an infinite while-loop)
         self._used_model_modules = []
         self._created_files = set()
+        # Cached by _get_restricted_modules together with the modification times of the directories
+        self._restricted_modules = None
+        self._restricted_modules_mtimes = None
+        # Cached by _get_module_name
+        self._module_names = {}
+        # Whether modules that are not allowed to be imported can be found, cached in _iotester_import
+        self._found_modules = {}
         self._out = LimitedBuffer(max_size=MAX_OUTPUT_LENGTH)
         self._save()
 
@@ -779,6 +1161,7 @@ class IOTester:
         # previous values for the settings that are not given.
         self.settings.update(settings)
         self._verify_settings()
+        self._update_permissions()
 
 
     def _verify_settings(self):
@@ -827,6 +1210,19 @@ class IOTester:
         )
 
 
+    def _update_permissions(self):
+        # Store the whitelists and blacklists as frozensets so that each checked import/open
+        # is a constant time lookup. Updated in _setup too since settings can be modified directly.
+        self._import_permissions = (
+            frozenset(self.settings["import_whitelist"]),
+            frozenset(self.settings["import_blacklist"]),
+        )
+        self._open_permissions = (
+            frozenset(self.settings["open_whitelist"]),
+            frozenset(self.settings["open_blacklist"]),
+        )
+
+
     def _save(self):
         """
         Save random number generator state, sys.path, sys.modules in grader and student
@@ -836,13 +1232,20 @@ class IOTester:
         TestCase's tearDown should call restore() to make sure that these variables
         are correctly set after running a test method that did not use IOTester.
         """
+        if remote.conn:
+            # The random module of the student process is used in every test, so its netref
+            # is bound to remote.conn instead of being looked up from sys.modules every time
+            remote.conn._random = remote.conn.modules.sys.modules["random"]
         self.previous = {
             "random_state": random.getstate(),
-            "sys_path": sys.path.copy(),
-            "sys_modules": sys.modules.copy(),
-            "remote_random_state": remote.conn.modules.sys.modules["random"].getstate() if remote.conn else None,
+            # Stored as a tuple so that restore() can copy it back without a defensive copy
+            "sys_path": tuple(sys.path),
+            # Only the names of the modules are needed for unloading modules in restore()
+            "sys_modules_keys": frozenset(sys.modules),
+            "remote_random_state": remote.conn._random.getstate() if remote.conn else None,
             "remote_sys_path": remote.conn.modules.sys.path.copy() if remote.conn else [],
-            "remote_sys_modules": remote.conn.modules.sys.modules.copy() if remote.conn else {},
+            # The frozenset is built in the student process so that the names are not transferred one by one
+            "remote_sys_modules_keys": remote.conn.builtins.frozenset(remote.conn.modules.sys.modules) if remote.conn else frozenset(),
             "remote_builtin_input": remote.conn.builtins.input if remote.conn else None,
         }
         if remote.conn:
@@ -861,16 +1264,16 @@ class IOTester:
         # Restore built-in input()
         __builtins__["input"] = _builtin_input
         # Restore previous sys.path
-        sys.path = self.previous["sys_path"].copy()
+        sys.path[:] = self.previous["sys_path"]
         # Remove imported modules from sys.modules.
         # Modules are unloaded so that input/output can be fed/captured on
         # module-level again by doing a complete re-import.
-        modules_to_unload = []
-        for m in sys.modules:
-            if m not in self.previous["sys_modules"]:
-                modules_to_unload.append(m)
+        modules_to_unload = sys.modules.keys() - self.previous["sys_modules_keys"]
         for m in modules_to_unload:
             del sys.modules[m]
+        # The code of unloaded modules is not needed anymore
+        self._module_names = {}
+        self._found_modules = {}
 
         if remote.conn and not remote.conn.closed:
             try:
@@ -879,18 +1282,18 @@ class IOTester:
                 # Restore built-in input() in student process
                 remote.conn.builtins.input = self.previous["remote_builtin_input"]
                 # Restore previous random state in student process
-                remote.conn.modules.sys.modules["random"].setstate(self.previous["remote_random_state"])
+                remote.conn._random.setstate(self.previous["remote_random_state"])
                 # Restore previous sys.path in student process
-                remote.conn.modules.sys.path = self.previous["remote_sys_path"].copy()
+                remote.conn.modules.sys.path[:] = self.previous["remote_sys_path"]
                 # Remove imported modules from sys.modules in student process.
                 # Modules are unloaded so that input/output can be fed/captured on
                 # module-level again by doing a complete re-import.
-                modules_to_unload = []
-                for m in remote.conn.modules.sys.modules:
-                    if m not in self.previous["remote_sys_modules"]:
-                        modules_to_unload.append(m)
-                for m in modules_to_unload:
-                    del remote.conn.modules.sys.modules[m]
+                # The student process is forked from the grader so it has graderutils.remote
+                # imported and can unload the modules itself with a single request.
+                unloaded_modules = remote.conn.modules["graderutils.remote"].unload_modules(
+                    self.previous["remote_sys_modules_keys"]
+                )
+                for m in unloaded_modules:
                     # Remove imported modules from rpyc cache if found
                     remote.conn.modules._ModuleNamespace__cache.pop(m, None)
             except TimeoutError:
@@ -901,14 +1304,15 @@ class IOTester:
         random.setstate(self.previous["random_state"])
         os.chdir(student_path)
 
-        if clean_up_files:
+        if clean_up_files and self._created_files:
             # Delete files previously created by the submission and model
             for file in self._created_files:
                 try:
                     os.remove(file)
                 except OSError:
                     pass
-            self._created_files = set()
+            self._created_files.clear()
+            self._restricted_modules = None
 
 
     def _setup(self):
@@ -919,6 +1323,7 @@ class IOTester:
         self.used_inputs_and_params = ""
         self.diff = ""
         self._verify_settings()
+        self._update_permissions()
 
 
     def _find_main_func_and_call(self):
@@ -926,15 +1331,20 @@ class IOTester:
         self.main_call_found = False
         path = os.path.join(student_path, self.module_to_test + ".py")
         try:
+            stat = os.stat(path)
+            key = (path, stat.st_size, stat.st_mtime_ns)
+            if key in _main_func_and_call_cache:
+                # The file has already been parsed successfully
+                self.main_func_found, self.main_call_found = _main_func_and_call_cache[key]
+                return
             with open(path, encoding="utf-8") as file: # Check for UnicodeDecodeError
                 data = file.read()
             ast.parse(data) # Check for SyntaxError
-            main_func_pattern = re.compile(r"^def\s+main\s*\(.*\)\s*:\s*$", re.MULTILINE)
-            main_call_pattern = re.compile(r"^main\s*\(.*\)\s*$", re.MULTILINE)
-            if re.search(main_func_pattern, data):
+            if _main_func_pattern.search(data):
                 self.main_func_found = True
-            if re.search(main_call_pattern, data):
+            if _main_call_pattern.search(data):
                 self.main_call_found = True
+            _main_func_and_call_cache[key] = (self.main_func_found, self.main_call_found)
         except SyntaxError as e:
             e.filename = path # Fixes '<unknown>' filename
             return e
@@ -966,10 +1376,7 @@ class IOTester:
         finally:
             self.restore(clean_up_files=False)
             # Built-in functions are restored later by the feedback decorator
-            self._override_builtin_import(model=True)
-            self._override_builtin_import(model=False)
-            self._override_builtin_open(model=True)
-            self._override_builtin_open(model=False)
+            self._override_model_and_student_builtins()
 
 
     def _set_description(self, string):
@@ -985,8 +1392,7 @@ class IOTester:
 
 
     def _set_diff(self, message, string, expected_string, hide_newlines=False):
-        diff_html1 = _get_diff_html(string, expected_string, "delete", hide_newlines)
-        diff_html2 = _get_diff_html(string, expected_string, "insert", hide_newlines)
+        diff_html1, diff_html2 = _get_diff_html(string, expected_string, hide_newlines)
         self.diff = message.format(_prepend_newline(diff_html1), _prepend_newline(diff_html2))
 
 
@@ -996,16 +1402,49 @@ class IOTester:
         self.used_inputs_and_params = MSG_USED_INPUTS_AND_PARAMS.format(inputs_str, params_str)
 
 
-    def _iotester_import(self, name, globals=None, locals=None, fromlist=(), level=0):
-        module_name = name.split('.')[0] # Imported module name
-        # Get importing module name
-        frame = inspect.stack()[1]
-        module = inspect.getmodule(frame[0])
+    def _get_restricted_modules(self, caller):
+        """
+        Return a set of the names of the modules in student_path and model_path and rpyc.core.protocol.
+        The set is cached until the files in the directories change, which is detected from
+        their modification times, since importing and opening files checks it every time.
+        """
+        try:
+            mtimes = (os.stat(student_path).st_mtime_ns, os.stat(model_path).st_mtime_ns)
+            if self._restricted_modules is None or mtimes != self._restricted_modules_mtimes:
+                restricted_modules = {"rpyc.core.protocol"}
+                restricted_modules.update(_py_module_names(student_path, model_path))
+                self._restricted_modules = frozenset(restricted_modules)
+                self._restricted_modules_mtimes = mtimes
+        except OSError:
+            raise GraderUtilsError("Failed os.scandir in {:s}.".format(caller))
+        return self._restricted_modules
+
+
+    def _get_module_name(self, frame):
+        # Name of the module that the code of frame belongs to.
+        # Cached by the code object since the same code usually imports or opens many times.
+        code = frame.f_code
+        cached = self._module_names.get(id(code))
+        if cached is not None and cached[0] is code:
+            return cached[1]
+        module = inspect.getmodule(frame)
         if module is None:
             # In case that inspect.getmodule fails to guess the module
-            importer = os.path.splitext(os.path.basename(inspect.getfile(frame[0])))[0]
+            name = os.path.splitext(os.path.basename(inspect.getfile(frame)))[0]
         else:
-            importer = module.__name__
+            name = module.__name__
+        # The code object is stored too so that its id cannot be reused by another code object
+        self._module_names[id(code)] = (code, name)
+        return name
+
+
+    def _iotester_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        module_name = name.split('.')[0] # Imported module name
+        # Get importing module name
+        # The caller's frame, without building the context of every frame in the stack like inspect.stack()
+        frame = sys._getframe(1)
+        importer = self._get_module_name(frame)
+
         module_path = os.path.abspath(module_name + ".py")
 
         if module_name == "graderutils":
@@ -1016,11 +1455,7 @@ class IOTester:
         else:
             allowed_to_import = (
                 module_name in _always_allowed_to_import
-                or _verify_permissions(
-                    module_name,
-                    self.settings["import_whitelist"],
-                    self.settings["import_blacklist"]
-                )
+                or _verify_permissions(module_name, *self._import_permissions)
             )
         if allowed_to_import and not os.path.exists(module_path):
             # Import module immediately if allowed (performing os.listdir for no reason is slow).
@@ -1039,13 +1474,13 @@ class IOTester:
                 finally:
                     __builtins__["__import__"] = self._iotester_import
 
-        restricted_modules = {"rpyc.core.protocol"} # Modules that are not allowed to import freely
-        try:
-            for f in os.listdir(student_path) + os.listdir(model_path): # slow
-                if os.path.splitext(os.path.basename(f))[1] == ".py":
-                    restricted_modules.add(os.path.splitext(os.path.basename(f))[0])
-        except OSError:
-            raise GraderUtilsError("Failed os.listdir in _iotester_import.")
+        # Modules that are not allowed to import freely.
+        # Scanned only after the whitelist check above, so allowed imports work without access
+        # to student_path and model_path.
+        restricted_modules = self._get_restricted_modules("_iotester_import")
+        if importer not in restricted_modules and name not in self._used_model_modules:
+            # Unrestricted importers (e.g. the standard library) import without any further checks
+            return importlib.__import__(name, globals, locals, fromlist, level)
 
         # Allow importing of whitelisted imports and restricted_modules.
         # Student code cannot import model modules because model_path is not in sys.path.
@@ -1063,15 +1498,20 @@ class IOTester:
             spec.loader.exec_module(model_module)
             return model_module
         elif not_allowed_to_import:
-            # Check if the module can be found
-            if remote.conn and importer == "rpyc.core.protocol":
-                # Using find_spec causes a RecursionError with rpyc, so we use find_loader instead
-                #spec = remote.conn._importlib.util.find_spec(name)
-                loader = remote.conn._importlib.find_loader(name)
-            else:
-                #spec = importlib.util.find_spec(name)
-                loader = importlib.find_loader(name)
-            found = loader is not None
+            # Check if the module can be found.
+            # The result is cached until restore() since the same import is often attempted repeatedly.
+            use_remote = bool(remote.conn) and importer == "rpyc.core.protocol"
+            found = self._found_modules.get((name, use_remote))
+            if found is None:
+                if use_remote:
+                    # Using find_spec causes a RecursionError with rpyc, so we use find_loader instead
+                    #spec = remote.conn._importlib.util.find_spec(name)
+                    loader = remote.conn._importlib.find_loader(name)
+                else:
+                    #spec = importlib.util.find_spec(name)
+                    loader = importlib.find_loader(name)
+                found = loader is not None
+                self._found_modules[(name, use_remote)] = found
             if found:
                 msg_grader_import = MSG_GRADER_IMPORT.format(module_name)
                 raise GraderImportError(msg_grader_import)
@@ -1094,40 +1534,23 @@ class IOTester:
             opener=None,
             ):
         # Get opener module name
-        frame = inspect.stack()[1]
-        module = inspect.getmodule(frame[0])
-        if module is None:
-            # In case that inspect.getmodule fails to guess the module
-            opener_name = os.path.splitext(os.path.basename(inspect.getfile(frame[0])))[0]
-        else:
-            opener_name = module.__name__
+        frame = sys._getframe(1)
+        opener_name = self._get_module_name(frame)
         if opener_name == "rpyc.core.protocol":
             opener_dir = student_path
         else:
-            opener_dir = os.path.dirname(os.path.abspath(inspect.getfile(frame[0])))
+            opener_dir = os.path.dirname(os.path.abspath(frame.f_code.co_filename))
 
-        restricted_modules = {"rpyc.core.protocol"} # Modules that are not allowed to open freely
-        try:
-            for f in os.listdir(student_path) + os.listdir(model_path): # slow
-                if os.path.splitext(os.path.basename(f))[1] == ".py":
-                    restricted_modules.add(os.path.splitext(os.path.basename(f))[0])
-        except OSError:
-            raise GraderUtilsError("Failed os.listdir in _iotester_open")
-
-        read_modes = ["r", "rt", "rb"]
-        write_modes = [
-            "x", "xt", "xb", "x+", "xt+", "xb+",
-            "w", "wt", "wb", "w+", "wt+", "wb+",
-            "a", "at", "ab", "a+", "at+", "ab+",
-            "r+", "rt+", "rb+"
-        ]
+        # Modules that are not allowed to open freely
+        restricted_modules = self._get_restricted_modules("_iotester_open")
+
+        # abspath only calls os.getcwd for relative paths
         path = os.path.abspath(file)
-        name = os.path.basename(path)
-        dir = os.path.dirname(path)
+        dir, name = os.path.split(path)
         msg_grader_open_read = MSG_GRADER_OPEN_READ.format(file)
         msg_grader_open_write = MSG_GRADER_OPEN_WRITE.format(file)
 
-        if dir == opener_dir and mode not in write_modes or opener_name not in restricted_modules:
+        if dir == opener_dir and mode not in _open_write_modes or opener_name not in restricted_modules:
             try:
                 # Attempt to open the file.
                 # File might not exist unless the student created it.
@@ -1135,19 +1558,13 @@ class IOTester:
             except FileNotFoundError:
                 found_file = None
                 try:
-                    # Check if the file is found in exercise_path
-                    for fname in os.listdir(exercise_path):
-                        if name == fname:
-                            found_file = os.path.join(exercise_path, name)
+                    # Check if the file is found in exercise_path or generated_path
+                    for search_path in (exercise_path, generated_path):
+                        if _dir_contains(search_path, name):
+                            found_file = os.path.join(search_path, name)
                             break
-                    if not found_file:
-                        # Check if the file is found in generated_path
-                        for fname in os.listdir(generated_path):
-                            if name == fname:
-                                found_file = os.path.join(generated_path, name)
-                                break
                 except OSError:
-                    raise GraderUtilsError("Failed os.listdir in _iotester_open.")
+                    raise GraderUtilsError("Failed os.scandir in _iotester_open.")
                 if not found_file:
                     # File was not found
                     raise
@@ -1155,7 +1572,7 @@ class IOTester:
                     # Generated data files are always allowed to be opened
                     return _builtin_open(found_file, mode, buffering, encoding, errors, newline, closefd, opener)
                 elif opener_name in restricted_modules:
-                    if _verify_permissions(name, self.settings["open_whitelist"], self.settings["open_blacklist"]):
+                    if _verify_permissions(name, *self._open_permissions):
                         # Open the file that was found (read)
                         return _builtin_open(found_file, mode, buffering, encoding, errors, newline, closefd, opener)
                     # No permission to read the found file
@@ -1164,27 +1581,28 @@ class IOTester:
                     # Open the file that was found (read or write)
                     return _builtin_open(found_file, mode, buffering, encoding, errors, newline, closefd, opener)
 
-        elif dir == opener_dir and not os.path.exists(path) and mode in write_modes:
+        elif dir == opener_dir and not os.path.exists(path) and mode in _open_write_modes:
             # Allow creation of a new file in opener_dir
             stream = _builtin_open(file, mode, buffering, encoding, errors, newline, closefd, opener)
             self._created_files.add(path)
+            self._restricted_modules = None
             return stream
-        elif dir == opener_dir and os.path.exists(path) and mode in write_modes:
+        elif dir == opener_dir and os.path.exists(path) and mode in _open_write_modes:
             if path in self._created_files:
                 # Allow overwriting of files created by submission/model
                 return _builtin_open(file, mode, buffering, encoding, errors, newline, closefd, opener)
             # Deny overwriting of submission/model files
             raise GraderOpenError(msg_grader_open_write)
-        elif mode in write_modes:
+        elif mode in _open_write_modes:
             if file:
                 # Deny writing of files outside of opener_dir
                 raise GraderOpenError(msg_grader_open_write)
             # Allow attempting to write with an empty filename (raises OSError)
             return _builtin_open(file, mode, buffering, encoding, errors, newline, closefd, opener)
-        elif dir == generated_path or _verify_permissions(name, self.settings["open_whitelist"], self.settings["open_blacklist"]):
+        elif dir == generated_path or _verify_permissions(name, *self._open_permissions):
             # Deny reading of files outside of opener_dir unless the file is whitelisted or in generated_path
             return _builtin_open(file, mode, buffering, encoding, errors, newline, closefd, opener)
-        elif mode in read_modes:
+        elif mode in _open_read_modes:
             # No permission to read file
             raise GraderOpenError(msg_grader_open_read)
         else:
@@ -1194,63 +1612,46 @@ class IOTester:
 
     def _iotester_input(self, prompt=""):
         result = line = _builtin_input(prompt)
+        input_enter_line, input_line_begin, input_line_end = _get_input_echo_parts(
+            IOTESTER_INPUT_BEGIN,
+            IOTESTER_INPUT_END,
+            IOTESTER_NO_ESCAPE_LT,
+            IOTESTER_NO_ESCAPE_GT,
+            IOTESTER_NO_ESCAPE_NBSP,
+            ENTER_STRING,
+        )
         if line == ENTER:
             result = ""
-            line = (
-                "{0}{4}{2}br{3}{1}".format(
-                    IOTESTER_INPUT_BEGIN,
-                    IOTESTER_INPUT_END,
-                    IOTESTER_NO_ESCAPE_LT,
-                    IOTESTER_NO_ESCAPE_GT,
-                    ENTER_STRING,
-                )
-            )
+            line = input_enter_line
         else:
-            line = (
-                '{0}{2}span{4}class="iotester-input"{3}{5}{2}/span{3}{2}br{3}{1}'.format(
-                    IOTESTER_INPUT_BEGIN,
-                    IOTESTER_INPUT_END,
-                    IOTESTER_NO_ESCAPE_LT,
-                    IOTESTER_NO_ESCAPE_GT,
-                    IOTESTER_NO_ESCAPE_NBSP,
-                    line,
-                )
-            )
+            line = input_line_begin + line + input_line_end
         self._out.write(line)
         return result
 
 
-    def _override_builtin_import(self, model):
+    def _override_builtins(self, model, override_input=True):
         # We override inside a function so that importing iotester doesn't change builtins
+        input_func = self._iotester_input if override_input else None
         if not remote.conn or model:
             __builtins__["__import__"] = self._iotester_import
-        elif not remote.conn.closed:
-            # Override __import__() in student process
-            remote.conn.builtins.__import__ = self._iotester_import
-        else:
-            raise GraderConnClosedError(MSG_GRADER_CONN_CLOSED)
-
-
-    def _override_builtin_open(self, model):
-        # We override inside a function so that importing iotester doesn't change builtins
-        if not remote.conn or model:
             __builtins__["open"] = self._iotester_open
+            if input_func is not None:
+                __builtins__["input"] = input_func
         elif not remote.conn.closed:
-            # Override open() in student process
-            remote.conn.builtins.open = self._iotester_open
+            # Override the built-in functions in student process with a single request
+            remote.conn.modules["graderutils.remote"].override_builtins(
+                self._iotester_import, self._iotester_open, input_func
+            )
         else:
             raise GraderConnClosedError(MSG_GRADER_CONN_CLOSED)
 
 
-    def _override_builtin_input(self, model):
-        # We override inside a function so that importing iotester doesn't change builtins
-        if not remote.conn or model:
-            __builtins__["input"] = self._iotester_input
-        elif not remote.conn.closed:
-            # Override input() in student process
-            remote.conn.builtins.input = self._iotester_input
-        else:
-            raise GraderConnClosedError(MSG_GRADER_CONN_CLOSED)
+    def _override_model_and_student_builtins(self):
+        # __import__() and open() in the grader process are used by model code and,
+        # without rpyc, also by student code, so they are overridden only once then
+        self._override_builtins(model=True, override_input=False)
+        if remote.conn:
+            self._override_builtins(model=False, override_input=False)
 
 
     @contextmanager
@@ -1280,21 +1681,19 @@ class IOTester:
             "exception": None,
             "output": "",
             "random_state": None,
-            "used_args": copy.deepcopy(args),
-            "used_kwargs": copy.deepcopy(kwargs),
+            "used_args": _copy_params(args),
+            "used_kwargs": _copy_params(kwargs),
         }
 
         seed = random.randrange(sys.maxsize)
         random.seed(seed)
         if remote.conn:
-            remote.conn.modules.sys.modules["random"].seed(seed)
+            remote.conn._random.seed(seed)
         os.chdir(model_path) if model else os.chdir(student_path)
 
         with self._captured_output(inputs) as out:
             try:
-                self._override_builtin_import(model)
-                self._override_builtin_open(model)
-                self._override_builtin_input(model)
+                self._override_builtins(model)
                 timeout = self.settings["max_exec_time"]
                 if remote.conn:
                     # Update rpyc timeout so that it matches result_or_timeout
@@ -1376,15 +1775,114 @@ class IOTester:
                 else:
                     # Maximum number of lines shown when program execution was not timed out
                     max_num_lines = MAX_OUTPUT_LINES
-                lines = out.getvalue().splitlines(keepends=True)
-                data["output"] = ''.join(lines[:min(max_num_lines, len(lines))])
-                data["output"] = data["output"].replace('\xa0', ' ').replace('\x00', r"\x00")
+                output = out.getvalue()
+                lines = output.splitlines(keepends=True)
+                if len(lines) > max_num_lines:
+                    output = ''.join(lines[:max_num_lines])
+                data["output"] = output.translate(_output_translation_table)
 
         self.restore(clean_up_files=False) # Files created by the module are deleted later
 
         return data
 
 
+    def _grader_error_messages(self, exception, model):
+        exception_str = str(exception)
+        if remote.conn and not model:
+            # Clean the exception string of possible irrelevant rpyc traceback
+            if exception.__class__.__name__ == "GraderImportError":
+                message_lines_amount = len(MSG_GRADER_IMPORT.splitlines())
+            else:
+                message_lines_amount = len(MSG_GRADER_OPEN_READ.splitlines())
+            exception_str = '\n'.join(exception_str.splitlines()[:message_lines_amount])
+        return [exception_str], _FEEDBACK_FULL, True
+
+
+    def _grader_timeout_error_messages(self, exception, model):
+        return [MSG_GRADER_TIMEOUT.format(self.settings["max_exec_time"])], _FEEDBACK_FULL, True
+
+
+    def _not_found_error_messages(self, exception, model):
+        # FunctionNotFoundError and ClassNotFoundError
+        return [str(exception)], _FEEDBACK_NAME, True
+
+
+    def _conn_closed_error_messages(self, exception, model):
+        return [str(exception)], _FEEDBACK_SHORT, True
+
+
+    def _module_or_file_not_found_error_messages(self, exception, model):
+        exception_name = exception.__class__.__name__
+        exception_str = str(exception).rstrip()
+        if remote.conn and not model:
+            # Clean the exception string of possible irrelevant rpyc traceback
+            i = _find_last_line(exception_str, exception_name)
+            if i != -1:
+                exception_str = exception_str[i:].split(": ", 1)[1]
+        if exception_name == "ModuleNotFoundError":
+            message = MSG_MODULENOTFOUNDERROR.format(exception_str)
+        else:
+            message = MSG_FILENOTFOUNDERROR.format(exception_str)
+        return [message], _FEEDBACK_FULL, True
+
+
+    def _eof_or_unbound_local_error_messages(self, exception, model):
+        exception_name = exception.__class__.__name__
+        message_str = str(exception).rstrip()
+        exception_str = exception_name + ": " + message_str
+        if remote.conn and not model:
+            # Clean the exception string of possible irrelevant rpyc traceback
+            if exception_name == "EOFError":
+                exception_str = message_str
+            i = _find_last_line(exception_str, exception_name)
+            if i != -1:
+                exception_str = exception_str[i:]
+        if exception_name == "EOFError":
+            message = MSG_EOFERROR
+        else:
+            message = MSG_UNBOUNDLOCALERROR
+        return [exception_str, message], _FEEDBACK_FULL, True
+
+
+    def _value_error_messages(self, exception, model):
+        exception_str = str(exception)
+        if exception_str == "list.remove(x): x not in list":
+            return [MSG_VALUEERROR_1], _FEEDBACK_FULL, False
+        elif exception_str == "source code string cannot contain null bytes":
+            return [MSG_VALUEERROR_2], _FEEDBACK_SHORT, True
+        return [MSG_VALUEERROR_3], _FEEDBACK_FULL, False
+
+
+    def _index_error_messages(self, exception, model):
+        exception_str = str(exception)
+        if "list" in exception_str:
+            message = MSG_INDEXERROR_LIST
+        elif "tuple" in exception_str:
+            message = MSG_INDEXERROR_TUPLE
+        elif "string" in exception_str:
+            message = MSG_INDEXERROR_STRING
+        else:
+            message = MSG_BASIC_ERROR
+        return [message], _FEEDBACK_FULL, False
+
+
+    # Exceptions whose feedback depends on the exception, by exception class name
+    _exception_message_handlers = {
+        "GraderConnClosedError": _conn_closed_error_messages,
+        "GraderImportError": _grader_error_messages,
+        "GraderOpenError": _grader_error_messages,
+        "GraderTimeoutError": _grader_timeout_error_messages,
+        "FunctionNotFoundError": _not_found_error_messages,
+        "ClassNotFoundError": _not_found_error_messages,
+        "ModuleNotFoundError": _module_or_file_not_found_error_messages,
+        "FileNotFoundError": _module_or_file_not_found_error_messages,
+        "EOFError": _eof_or_unbound_local_error_messages,
+        "UnboundLocalError": _eof_or_unbound_local_error_messages,
+        "ValueError": _value_error_messages,
+        "IndexError": _index_error_messages,
+    }
+
+
     def _raise_exception_with_feedback(self, exception, show_diff, model):
         msg_colors = MSG_COLORS
         if not show_diff:
@@ -1393,373 +1891,44 @@ class IOTester:
         # Exception class is checked based on name because using type()
         # does not behave normally when using rpyc.
         exception_name = exception.__class__.__name__
-        if exception_name == "GraderConnClosedError":
-            self.test_case.iotester_data["feedback"] = _combine_feedback([
-                MSG_PYTHON_VERSION,
-                str(exception),
-            ])
-            self.test_case.iotester_data["hideTraceback"] = True
-        elif exception_name == "GraderImportError":
-            exception_str = str(exception)
-            if remote.conn and not model:
-                # Clean the exception string of possible irrelevant rpyc traceback
-                message_lines_amount = len(MSG_GRADER_IMPORT.splitlines())
-                exception_str = '\n'.join(exception_str.splitlines()[:message_lines_amount])
-            self.test_case.iotester_data["feedback"] = _combine_feedback([
-                MSG_PYTHON_VERSION,
-                msg_colors,
-                exception_str,
-                self.name_tested,
-                self.desc,
-                self.diff,
-                self.used_inputs_and_params,
-            ])
-            self.test_case.iotester_data["hideTraceback"] = True
-        elif exception_name == "GraderOpenError":
-            exception_str = str(exception)
-            if remote.conn and not model:
-                # Clean the exception string of possible irrelevant rpyc traceback
-                message_lines_amount = len(MSG_GRADER_OPEN_READ.splitlines())
-                exception_str = '\n'.join(exception_str.splitlines()[:message_lines_amount])
-            self.test_case.iotester_data["feedback"] = _combine_feedback([
-                MSG_PYTHON_VERSION,
-                msg_colors,
-                exception_str,
-                self.name_tested,
-                self.desc,
-                self.diff,
-                self.used_inputs_and_params,
-            ])
-            self.test_case.iotester_data["hideTraceback"] = True
-        elif exception_name == "GraderTimeoutError":
-            self.test_case.iotester_data["feedback"] = _combine_feedback([
-                MSG_PYTHON_VERSION,
-                msg_colors,
-                MSG_GRADER_TIMEOUT.format(self.settings["max_exec_time"]),
-                self.name_tested,
-                self.desc,
-                self.diff,
-                self.used_inputs_and_params,
-            ])
-            self.test_case.iotester_data["hideTraceback"] = True
-        elif exception_name == "GraderIOError":
-            self.test_case.iotester_data["feedback"] = _combine_feedback([
-                MSG_PYTHON_VERSION,
-                msg_colors,
-                MSG_GRADER_BUFFER,
-                self.name_tested,
-                self.desc,
-                self.diff,
-                self.used_inputs_and_params,
-            ])
-            self.test_case.iotester_data["hideTraceback"] = True
-        elif exception_name == "FunctionNotFoundError":
-            self.test_case.iotester_data["feedback"] = _combine_feedback([
-                MSG_PYTHON_VERSION,
-                str(exception),
-                self.name_tested,
-            ])
-            self.test_case.iotester_data["hideTraceback"] = True
-        elif exception_name == "ClassNotFoundError":
-            self.test_case.iotester_data["feedback"] = _combine_feedback([
-                MSG_PYTHON_VERSION,
-                str(exception),
-                self.name_tested,
-            ])
-            self.test_case.iotester_data["hideTraceback"] = True
-        elif exception_name == "ModuleNotFoundError":
-            exception_str = str(exception).rstrip()
-            if remote.conn and not model:
-                # Clean the exception string of possible irrelevant rpyc traceback
-                message_line_found = False
-                for line in exception_str.splitlines(keepends=True):
-                    if line.startswith("ModuleNotFoundError:"):
-                        exception_str = line.split(": ", 1)[1]
-                        message_line_found = True
-                    elif message_line_found:
-                        exception_str += line
-            self.test_case.iotester_data["feedback"] = _combine_feedback([
-                MSG_PYTHON_VERSION,
-                msg_colors,
-                MSG_MODULENOTFOUNDERROR.format(exception_str),
-                self.name_tested,
-                self.desc,
-                self.diff,
-                self.used_inputs_and_params,
-            ])
-            self.test_case.iotester_data["hideTraceback"] = True
-        elif exception_name == "FileNotFoundError":
-            exception_str = str(exception).rstrip()
-            if remote.conn and not model:
-                # Clean the exception string of possible irrelevant rpyc traceback
-                message_line_found = False
-                for line in exception_str.splitlines(keepends=True):
-                    if line.startswith("FileNotFoundError:"):
-                        exception_str = line.split(": ", 1)[1]
-                        message_line_found = True
-                    elif message_line_found:
-                        exception_str += line
-            self.test_case.iotester_data["feedback"] = _combine_feedback([
-                MSG_PYTHON_VERSION,
-                msg_colors,
-                MSG_FILENOTFOUNDERROR.format(exception_str),
-                self.name_tested,
-                self.desc,
-                self.diff,
-                self.used_inputs_and_params,
-            ])
-            self.test_case.iotester_data["hideTraceback"] = True
-        elif exception_name == "TimeoutError":
-            self.test_case.iotester_data["feedback"] = _combine_feedback([
-                MSG_PYTHON_VERSION,
-                msg_colors,
-                MSG_TIMEOUTERROR,
-                self.name_tested,
-                self.desc,
-                self.diff,
-                self.used_inputs_and_params,
-            ])
-        elif exception_name == "EOFError":
-            exception_str = "EOFError: " + str(exception).rstrip()
-            if remote.conn and not model:
-                # Clean the exception string of possible irrelevant rpyc traceback
-                exception_str = str(exception).rstrip()
-                message_line_found = False
-                for line in exception_str.splitlines(keepends=True):
-                    if line.startswith("EOFError:"):
-                        exception_str = line
-                        message_line_found = True
-                    elif message_line_found:
-                        exception_str += line
-            self.test_case.iotester_data["feedback"] = _combine_feedback([
-                MSG_PYTHON_VERSION,
-                msg_colors,
-                exception_str,
-                MSG_EOFERROR,
-                self.name_tested,
-                self.desc,
-                self.diff,
-                self.used_inputs_and_params,
-            ])
-            self.test_case.iotester_data["hideTraceback"] = True
-        elif exception_name == "MainCallNotFoundError":
-            self.test_case.iotester_data["feedback"] = _combine_feedback([
-                MSG_PYTHON_VERSION,
-                MSG_MAIN_CALL_NOT_FOUND,
-                self.name_tested,
-            ])
-            self.test_case.iotester_data["hideTraceback"] = True
-        elif exception_name == "ImportError":
-            self.test_case.iotester_data["feedback"] = _combine_feedback([
+        # Find the messages, the layout of the feedback and whether to hide the traceback
+        # with a single lookup instead of comparing the name to every supported exception
+        if exception_name in _exception_messages:
+            get_message, layout, hide_traceback = _exception_messages[exception_name]
+            messages = [get_message()]
+        elif exception_name in self._exception_message_handlers:
+            handler = self._exception_message_handlers[exception_name]
+            messages, layout, hide_traceback = handler(self, exception, model)
+        else:
+            messages, layout, hide_traceback = [MSG_BASIC_ERROR], _FEEDBACK_FULL, False
+            if exception_name == "AssertionError":
+                self.test_case.failureException = GraderUtilsError
+
+        if layout == _FEEDBACK_FULL:
+            feedback = [
                 MSG_PYTHON_VERSION,
                 msg_colors,
-                MSG_IMPORTERROR,
+                *messages,
                 self.name_tested,
                 self.desc,
                 self.diff,
                 self.used_inputs_and_params,
-            ])
-        elif exception_name == "SystemExit":
-            self.test_case.iotester_data["feedback"] = _combine_feedback([
-                MSG_PYTHON_VERSION,
-                MSG_SYSTEMEXIT,
-                self.name_tested,
-                self.desc,
-                self.used_inputs_and_params,
-            ])
-            self.test_case.iotester_data["hideTraceback"] = True
-        elif exception_name == "KeyboardInterrupt":
-            self.test_case.iotester_data["feedback"] = _combine_feedback([
+            ]
+        elif layout == _FEEDBACK_PROGRAM:
+            feedback = [
                 MSG_PYTHON_VERSION,
-                MSG_KEYBOARDINTERRUPT,
+                *messages,
                 self.name_tested,
                 self.desc,
                 self.used_inputs_and_params,
-            ])
+            ]
+        elif layout == _FEEDBACK_NAME:
+            feedback = [MSG_PYTHON_VERSION, *messages, self.name_tested]
+        else:
+            feedback = [MSG_PYTHON_VERSION, *messages]
+        self.test_case.iotester_data["feedback"] = _combine_feedback(feedback)
+        if hide_traceback:
             self.test_case.iotester_data["hideTraceback"] = True
-        elif exception_name == "ValueError":
-            if str(exception) == "list.remove(x): x not in list":
-                self.test_case.iotester_data["feedback"] = _combine_feedback([
-                    MSG_PYTHON_VERSION,
-                    msg_colors,
-                    MSG_VALUEERROR_1,
-                    self.name_tested,
-                    self.desc,
-                    self.diff,
-                    self.used_inputs_and_params,
-                ])
-            elif str(exception) == "source code string cannot contain null bytes":
-                self.test_case.iotester_data["feedback"] = _combine_feedback([
-                    MSG_PYTHON_VERSION,
-                    MSG_VALUEERROR_2,
-                ])
-                self.test_case.iotester_data["hideTraceback"] = True
-            else:
-                self.test_case.iotester_data["feedback"] = _combine_feedback([
-                    MSG_PYTHON_VERSION,
-                    msg_colors,
-                    MSG_VALUEERROR_3,
-                    self.name_tested,
-                    self.desc,
-                    self.diff,
-                    self.used_inputs_and_params,
-                ])
-        elif exception_name == "AttributeError":
-            self.test_case.iotester_data["feedback"] = _combine_feedback([
-                MSG_PYTHON_VERSION,
-                msg_colors,
-                MSG_ATTRIBUTEERROR,
-                self.name_tested,
-                self.desc,
-                self.diff,
-                self.used_inputs_and_params,
-            ])
-        elif exception_name == "UnboundLocalError":
-            exception_str = "UnboundLocalError: " + str(exception).rstrip()
-            if remote.conn and not model:
-                # Clean the exception string of possible irrelevant rpyc traceback
-                message_line_found = False
-                for line in exception_str.splitlines(keepends=True):
-                    if line.startswith("UnboundLocalError:"):
-                        exception_str = line
-                        message_line_found = True
-                    elif message_line_found:
-                        exception_str += line
-            self.test_case.iotester_data["feedback"] = _combine_feedback([
-                MSG_PYTHON_VERSION,
-                msg_colors,
-                exception_str,
-                MSG_UNBOUNDLOCALERROR,
-                self.name_tested,
-                self.desc,
-                self.diff,
-                self.used_inputs_and_params,
-            ])
-            self.test_case.iotester_data["hideTraceback"] = True
-        elif exception_name == "NameError":
-            self.test_case.iotester_data["feedback"] = _combine_feedback([
-                MSG_PYTHON_VERSION,
-                msg_colors,
-                MSG_NAMEERROR,
-                self.name_tested,
-                self.desc,
-                self.diff,
-                self.used_inputs_and_params,
-            ])
-        elif exception_name == "ZeroDivisionError":
-            self.test_case.iotester_data["feedback"] = _combine_feedback([
-                MSG_PYTHON_VERSION,
-                msg_colors,
-                MSG_ZERODIVISIONERROR,
-                self.name_tested,
-                self.desc,
-                self.diff,
-                self.used_inputs_and_params,
-            ])
-        elif exception_name == "TypeError":
-            self.test_case.iotester_data["feedback"] = _combine_feedback([
-                MSG_PYTHON_VERSION,
-                msg_colors,
-                MSG_TYPEERROR,
-                self.name_tested,
-                self.desc,
-                self.diff,
-                self.used_inputs_and_params,
-            ])
-        elif exception_name == "RecursionError":
-            self.test_case.iotester_data["feedback"] = _combine_feedback([
-                MSG_PYTHON_VERSION,
-                msg_colors,
-                MSG_RECURSIONERROR,
-                self.name_tested,
-                self.desc,
-                self.diff,
-                self.used_inputs_and_params,
-            ])
-        elif exception_name == "UnicodeDecodeError":
-            self.test_case.iotester_data["feedback"] = _combine_feedback([
-                MSG_PYTHON_VERSION,
-                MSG_UNICODEDECODEERROR,
-            ])
-            self.test_case.iotester_data["hideTraceback"] = True
-        elif exception_name == "SyntaxError":
-            self.test_case.iotester_data["feedback"] = _combine_feedback([
-                MSG_PYTHON_VERSION,
-                MSG_SYNTAXERROR,
-            ])
-        elif exception_name == "IndentationError":
-            self.test_case.iotester_data["feedback"] = _combine_feedback([
-                MSG_PYTHON_VERSION,
-                MSG_INDENTATIONERROR,
-            ])
-        elif exception_name == "TabError":
-            self.test_case.iotester_data["feedback"] = _combine_feedback([
-                MSG_PYTHON_VERSION,
-                MSG_TABERROR,
-            ])
-        elif exception_name == "IndexError":
-            if "list" in str(exception):
-                self.test_case.iotester_data["feedback"] = _combine_feedback([
-                    MSG_PYTHON_VERSION,
-                    msg_colors,
-                    MSG_INDEXERROR_LIST,
-                    self.name_tested,
-                    self.desc,
-                    self.diff,
-                    self.used_inputs_and_params,
-                ])
-            elif "tuple" in str(exception):
-                self.test_case.iotester_data["feedback"] = _combine_feedback([
-                    MSG_PYTHON_VERSION,
-                    msg_colors,
-                    MSG_INDEXERROR_TUPLE,
-                    self.name_tested,
-                    self.desc,
-                    self.diff,
-                    self.used_inputs_and_params,
-                ])
-            elif "string" in str(exception):
-                self.test_case.iotester_data["feedback"] = _combine_feedback([
-                    MSG_PYTHON_VERSION,
-                    msg_colors,
-                    MSG_INDEXERROR_STRING,
-                    self.name_tested,
-                    self.desc,
-                    self.diff,
-                    self.used_inputs_and_params,
-                ])
-            else:
-                self.test_case.iotester_data["feedback"] = _combine_feedback([
-                    MSG_PYTHON_VERSION,
-                    msg_colors,
-                    MSG_BASIC_ERROR,
-                    self.name_tested,
-                    self.desc,
-                    self.diff,
-                    self.used_inputs_and_params,
-                ])
-        elif exception_name == "KeyError":
-            self.test_case.iotester_data["feedback"] = _combine_feedback([
-                MSG_PYTHON_VERSION,
-                msg_colors,
-                MSG_KEYERROR,
-                self.name_tested,
-                self.desc,
-                self.diff,
-                self.used_inputs_and_params,
-            ])
-        else:
-            self.test_case.iotester_data["feedback"] = _combine_feedback([
-                MSG_PYTHON_VERSION,
-                msg_colors,
-                MSG_BASIC_ERROR,
-                self.name_tested,
-                self.desc,
-                self.diff,
-                self.used_inputs_and_params,
-            ])
-            if exception_name == "AssertionError":
-                self.test_case.failureException = GraderUtilsError
         if model:
             warning_msg = '<span class="iotester-warning">{:s}</span>'.format(MSG_MODEL_ERROR)
             self.test_case.iotester_data["warning"] = warning_msg
@@ -1768,22 +1937,10 @@ class IOTester:
         raise exception
 
 
-    def text_test(
-            self,
-            func_name="",
-            args=(),
-            kwargs={},
-            inputs=[],
-            prog=None,
-            prog_args=(),
-            prog_kwargs={},
-            prog_inputs=[],
-            desc="",
-            compare_capitalization=False,
-            ):
+    def _prepare_test(self, func_name, args, kwargs, inputs, prog, prog_args, prog_kwargs, prog_inputs, desc):
         """
-        Run the model program and the student program and compare the text outputs.
-        Ignore numbers, whitespace and characters specified in self.settings["ignored_characters"].
+        Set up a test that runs func_name or prog and set the feedback parts describing it.
+        Return the args, kwargs and inputs to run with and the name of the tested function.
         """
         self._setup()
         used_args = prog_args if prog else args
@@ -1797,6 +1954,17 @@ class IOTester:
         self._set_used_inputs_and_params(inputs, args, kwargs)
         if self.prepare_exception:
             self._raise_exception_with_feedback(self.prepare_exception, show_diff=False, model=False)
+        return used_args, used_kwargs, used_inputs, name_tested
+
+
+    def _run_model_and_student(self, func_name, args, kwargs, inputs, prog, prog_args, prog_kwargs, prog_inputs, desc):
+        """
+        Run the model program and the student program for the output tests.
+        Return the data collected from the student and the model program.
+        """
+        used_args, used_kwargs, used_inputs, name_tested = self._prepare_test(
+            func_name, args, kwargs, inputs, prog, prog_args, prog_kwargs, prog_inputs, desc,
+        )
         expected_data = self._run_program(func_name, used_args, used_kwargs, used_inputs, prog, model=True)
         #print(expected_data, file=sys.stderr) # Debug print
         data = self._run_program(name_tested, used_args, used_kwargs, used_inputs, prog, model=False)
@@ -1806,6 +1974,10 @@ class IOTester:
             self._raise_exception_with_feedback(expected_data["exception"], show_diff=True, model=True)
         if data["exception"]:
             self._raise_exception_with_feedback(data["exception"], show_diff=True, model=False)
+        return data, expected_data
+
+
+    def _compare_text(self, data, expected_data, compare_capitalization):
         self.test_case.iotester_data["feedback"] = _combine_feedback([
             MSG_PYTHON_VERSION,
             MSG_COLORS,
@@ -1819,17 +1991,18 @@ class IOTester:
         numbers = _get_numbers_from_string(data["output"])
         expected_numbers = _get_numbers_from_string(expected_data["output"])
         # Strip numbers and whitespace from both outputs
+        ignored_characters = self.settings["ignored_characters"]
         stripped_output = _strip_string(
             data["output"],
             numbers,
-            self.settings["ignored_characters"],
+            ignored_characters,
             strip_numbers=True,
             strip_whitespace=True,
         )
         expected_stripped_output = _strip_string(
             expected_data["output"],
             expected_numbers,
-            self.settings["ignored_characters"],
+            ignored_characters,
             strip_numbers=True,
             strip_whitespace=True,
         )
@@ -1848,49 +2021,9 @@ class IOTester:
             self.diff,
             self.used_inputs_and_params,
         ])
-        # Return the data that was collected when running the two programs
-        return data, expected_data
 
 
-    def numbers_test(
-            self,
-            func_name="",
-            args=(),
-            kwargs={},
-            inputs=[],
-            prog=None,
-            prog_args=(),
-            prog_kwargs={},
-            prog_inputs=[],
-            desc="",
-            compare_formatting=False,
-            ):
-        """
-        Run the model program and the student program and compare the numbers in the outputs.
-        Ignore everything except numbers.
-        Match integers, decimals and numbers such as +1, 2e9, +2E+09, -2.0e-9.
-        """
-        self._setup()
-        used_args = prog_args if prog else args
-        used_kwargs = prog_kwargs if prog else kwargs
-        used_inputs = prog_inputs if prog else inputs
-        name_tested = func_name
-        if not func_name:
-            name_tested = "main" if self.main_func_found else ""
-        self._set_name_tested(name_tested)
-        self._set_description(desc)
-        self._set_used_inputs_and_params(inputs, args, kwargs)
-        if self.prepare_exception:
-            self._raise_exception_with_feedback(self.prepare_exception, show_diff=False, model=False)
-        expected_data = self._run_program(func_name, used_args, used_kwargs, used_inputs, prog, model=True)
-        #print(expected_data, file=sys.stderr) # Debug print
-        data = self._run_program(name_tested, used_args, used_kwargs, used_inputs, prog, model=False)
-        #print(data, file=sys.stderr) # Debug print
-        self._set_diff(MSG_OUTPUT_DIFF, data["output"], expected_data["output"])
-        if expected_data["exception"]:
-            self._raise_exception_with_feedback(expected_data["exception"], show_diff=True, model=True)
-        if data["exception"]:
-            self._raise_exception_with_feedback(data["exception"], show_diff=True, model=False)
+    def _compare_numbers(self, data, expected_data, compare_formatting):
         self.test_case.iotester_data["feedback"] = _combine_feedback([
             MSG_PYTHON_VERSION,
             MSG_COLORS,
@@ -1905,25 +2038,38 @@ class IOTester:
         expected_numbers = _get_numbers_from_string(expected_data["output"])
         # Check that the same amount of numbers exist in both outputs
         self.test_case.assertEqual(len(numbers), len(expected_numbers))
-        # Compare numbers
+        # Compare numbers.
+        # The assert methods are called only when the numbers differ, which fails the test
+        # with the same message, so outputs with many numbers are compared without a method call per number.
+        assert_equal = self.test_case.assertEqual
+        assert_almost_equal = self.test_case.assertAlmostEqual
+        max_int_delta = self.settings["max_int_delta"]
+        max_float_delta = self.settings["max_float_delta"]
         try:
             for number, expected_number in zip(numbers, expected_numbers):
                 if 'e' in expected_number.lower():
                     # Expected number is in scientific format
-                    self.test_case.assertEqual(number.lower(), expected_number.lower())
+                    if number.lower() != expected_number.lower():
+                        assert_equal(number.lower(), expected_number.lower())
                 elif '.' not in expected_number:
                     # Expected number is an integer
-                    self.test_case.assertAlmostEqual(int(number), int(expected_number), delta=self.settings["max_int_delta"])
+                    value, expected_value = int(number), int(expected_number)
+                    if not abs(value - expected_value) <= max_int_delta:
+                        assert_almost_equal(value, expected_value, delta=max_int_delta)
                     if compare_formatting:
                         # Compare formatting of integers
-                        self.test_case.assertEqual(len(number), len(expected_number))
+                        assert_equal(len(number), len(expected_number))
                 else:
                     # Expected number is a float
-                    self.test_case.assertAlmostEqual(float(number), float(expected_number), delta=self.settings["max_float_delta"])
+                    value, expected_value = float(number), float(expected_number)
+                    if not abs(value - expected_value) <= max_float_delta:
+                        assert_almost_equal(value, expected_value, delta=max_float_delta)
                     if compare_formatting:
                         # Compare formatting of floats
-                        self.test_case.assertEqual(len(number.split('.')[0]), len(expected_number.split('.')[0]))
-                        self.test_case.assertEqual(len(number.split('.')[1]), len(expected_number.split('.')[1]))
+                        number_parts = number.split('.')
+                        expected_number_parts = expected_number.split('.')
+                        assert_equal(len(number_parts[0]), len(expected_number_parts[0]))
+                        assert_equal(len(number_parts[1]), len(expected_number_parts[1]))
         except (ValueError, IndexError):
             self.test_case.fail(MSG_NUMBERS)
 
@@ -1935,6 +2081,114 @@ class IOTester:
             self.diff,
             self.used_inputs_and_params,
         ])
+
+
+    def _compare_whitespace(self, data, expected_data):
+        self.test_case.iotester_data["feedback"] = _combine_feedback([
+            MSG_PYTHON_VERSION,
+            MSG_COLORS,
+            MSG_WHITESPACE,
+            self.name_tested,
+            self.desc,
+            self.diff,
+            self.used_inputs_and_params,
+        ])
+        # Get numbers (as strings) from both outputs
+        numbers = _get_numbers_from_string(data["output"])
+        expected_numbers = _get_numbers_from_string(expected_data["output"])
+        # Whitespace minus check has to be performed for the numbers whose signs differ.
+        # The amounts of numbers are equal because the numbers were compared first.
+        minus_check_indexes = [
+            i for i, (number, expected_number) in enumerate(zip(numbers, expected_numbers))
+            if number.startswith('-') != expected_number.startswith('-')
+        ]
+        # Compare outputs
+        ignored_characters = self.settings["ignored_characters"]
+        stripped_output = _strip_string(
+            data["output"],
+            numbers,
+            ignored_characters,
+            strip_numbers=False,
+            strip_whitespace=False,
+            minus_check_indexes=minus_check_indexes,
+        )
+        expected_stripped_output = _strip_string(
+            expected_data["output"],
+            expected_numbers,
+            ignored_characters,
+            strip_numbers=False,
+            strip_whitespace=False,
+            minus_check_indexes=minus_check_indexes,
+        )
+        # Example:
+        # data["expected_output"] = "Numbers   are  0.00 and 82.\nThat's it."
+        # data["output"]          = "numbers   are -0.00 and 82.\nthat's it."
+        # expected_stripped_output = "Numbers   are  [iotester-minus-check] and [iotester-number]\nThats it"
+        # stripped_output          = "numbers   are [iotester-minus-check] and [iotester-number]\nthats it"
+        output, expected_output = _whitespace_minus_check_patch(
+            stripped_output.lower(),
+            expected_stripped_output.lower(),
+        )
+        # expected_output = "numbers   are  [iotester-minus-check] and [iotester-number]\nthats it"
+        # output          = "numbers   are  [iotester-minus-check] and [iotester-number]\nthats it"
+        self.test_case.assertEqual(output, expected_output)
+        self.test_case.iotester_data["feedback"] = _combine_feedback([
+            MSG_PYTHON_VERSION,
+            MSG_COLORS,
+            self.name_tested,
+            self.desc,
+            self.diff,
+            self.used_inputs_and_params,
+        ])
+
+
+    def text_test(
+            self,
+            func_name="",
+            args=(),
+            kwargs={},
+            inputs=[],
+            prog=None,
+            prog_args=(),
+            prog_kwargs={},
+            prog_inputs=[],
+            desc="",
+            compare_capitalization=False,
+            ):
+        """
+        Run the model program and the student program and compare the text outputs.
+        Ignore numbers, whitespace and characters specified in self.settings["ignored_characters"].
+        """
+        data, expected_data = self._run_model_and_student(
+            func_name, args, kwargs, inputs, prog, prog_args, prog_kwargs, prog_inputs, desc,
+        )
+        self._compare_text(data, expected_data, compare_capitalization)
+        # Return the data that was collected when running the two programs
+        return data, expected_data
+
+
+    def numbers_test(
+            self,
+            func_name="",
+            args=(),
+            kwargs={},
+            inputs=[],
+            prog=None,
+            prog_args=(),
+            prog_kwargs={},
+            prog_inputs=[],
+            desc="",
+            compare_formatting=False,
+            ):
+        """
+        Run the model program and the student program and compare the numbers in the outputs.
+        Ignore everything except numbers.
+        Match integers, decimals and numbers such as +1, 2e9, +2E+09, -2.0e-9.
+        """
+        data, expected_data = self._run_model_and_student(
+            func_name, args, kwargs, inputs, prog, prog_args, prog_kwargs, prog_inputs, desc,
+        )
+        self._compare_numbers(data, expected_data, compare_formatting)
         # Return the data that was collected when running the two programs
         return data, expected_data
 
@@ -1956,18 +2210,9 @@ class IOTester:
         Run a function from the model program and the student program and compare the return values
         of the two functions.
         """
-        self._setup()
-        used_args = prog_args if prog else args
-        used_kwargs = prog_kwargs if prog else kwargs
-        used_inputs = prog_inputs if prog else inputs
-        name_tested = func_name
-        if not func_name:
-            name_tested = "main" if self.main_func_found else ""
-        self._set_name_tested(name_tested)
-        self._set_description(desc)
-        self._set_used_inputs_and_params(inputs, args, kwargs)
-        if self.prepare_exception:
-            self._raise_exception_with_feedback(self.prepare_exception, show_diff=False, model=False)
+        used_args, used_kwargs, used_inputs, name_tested = self._prepare_test(
+            func_name, args, kwargs, inputs, prog, prog_args, prog_kwargs, prog_inputs, desc,
+        )
         expected_data = self._run_program(func_name, used_args, used_kwargs, used_inputs, prog, model=True)
         #print(expected_data, file=sys.stderr) # Debug print
         data = self._run_program(name_tested, used_args, used_kwargs, used_inputs, prog, model=False)
@@ -1978,16 +2223,8 @@ class IOTester:
         if data["exception"]:
             self._raise_exception_with_feedback(data["exception"], show_diff=False, model=False)
 
-        def return_value_to_str(return_value):
-            return_value_str = repr(return_value)
-            # Strip memory address information
-            matches = re.findall(" at 0x[0123456789abcdef]+", return_value_str)
-            for match in matches:
-                return_value_str = return_value_str.replace(match, '')
-            return return_value_str
-
-        return_value_str = return_value_to_str(data["return_value"])
-        expected_return_value_str = return_value_to_str(expected_data["return_value"])
+        return_value_str = _return_value_to_str(data["return_value"])
+        expected_return_value_str = _return_value_to_str(expected_data["return_value"])
         self._set_diff(MSG_RETURN_VALUE_DIFF, return_value_str, expected_return_value_str)
         feedback_parts = [
             MSG_PYTHON_VERSION,
@@ -2006,41 +2243,13 @@ class IOTester:
         self.test_case.iotester_data["feedback"] = _combine_feedback(feedback_parts)
 
         # Compare return values with each other
-        def compare_elems(elem1, elem2):
-            # Check that return values are of the same type.
-            # The __class__ attribute is used because type() returns rpyc.core.netref.type when using rpyc.
-            # Calling repr() below allows elements to be from different modules.
-            self.test_case.assertEqual(repr(elem1.__class__), repr(elem2.__class__))
-            if isinstance(elem2, bool) or isinstance(elem2, str):
-                self.test_case.assertEqual(elem1, elem2)
-            elif isinstance(elem2, int):
-                self.test_case.assertAlmostEqual(elem1, elem2, delta=self.settings["max_int_delta"])
-            elif isinstance(elem2, float):
-                self.test_case.assertAlmostEqual(elem1, elem2, delta=self.settings["max_float_delta"])
-            elif isinstance(elem2, list) or isinstance(elem2, tuple):
-                self.test_case.assertEqual(len(elem1), len(elem2))
-                for i in range(len(elem2)):
-                    compare_elems(elem1[i], elem2[i])
-            elif isinstance(elem2, set):
-                self.test_case.assertEqual(len(elem1), len(elem2))
-                diff1 = elem2.difference(elem1)
-                self.test_case.assertEqual(len(diff1), 0)
-                diff2 = elem1.difference(elem2)
-                self.test_case.assertEqual(len(diff2), 0)
-            elif isinstance(elem2, dict):
-                self.test_case.assertEqual(len(elem1), len(elem2))
-                for key in elem2:
-                    if key not in elem1:
-                        self.test_case.fail(MSG_RETURN_VALUE)
-                    else:
-                        compare_elems(elem1[key], elem2[key])
-            elif inspect.isclass(elem2):
-                self.test_case.assertEqual(repr(elem1), repr(elem2))
-            else:
-                # Compare other objects
-                pass
-
-        compare_elems(data["return_value"], expected_data["return_value"])
+        _compare_return_values(
+            self.test_case,
+            data["return_value"],
+            expected_data["return_value"],
+            self.settings["max_int_delta"],
+            self.settings["max_float_delta"],
+        )
 
         feedback_parts = [
             MSG_PYTHON_VERSION,
@@ -2074,85 +2283,16 @@ class IOTester:
         Run the model program and the student program and compare the text, numbers and whitespace.
         Ignore characters specified in self.settings["ignored_characters"].
         """
+        # The programs are run only once and the same outputs are used for comparing
+        # the text, numbers and whitespace
+        data, expected_data = self._run_model_and_student(
+            func_name, args, kwargs, inputs, prog, prog_args, prog_kwargs, prog_inputs, desc,
+        )
         # Text and numbers in output are tested first
-        self.text_test(func_name, args, kwargs, inputs, prog, prog_args, prog_kwargs, prog_inputs, desc, compare_capitalization)
-        self.numbers_test(func_name, args, kwargs, inputs, prog, prog_args, prog_kwargs, prog_inputs, desc, compare_formatting=True)
+        self._compare_text(data, expected_data, compare_capitalization)
+        self._compare_numbers(data, expected_data, compare_formatting=True)
         # Begin testing of whitespace
-        self._setup()
-        used_args = prog_args if prog else args
-        used_kwargs = prog_kwargs if prog else kwargs
-        used_inputs = prog_inputs if prog else inputs
-        name_tested = func_name
-        if not func_name:
-            name_tested = "main" if self.main_func_found else ""
-        self._set_name_tested(name_tested)
-        self._set_description(desc)
-        self._set_used_inputs_and_params(inputs, args, kwargs)
-        if self.prepare_exception:
-            self._raise_exception_with_feedback(self.prepare_exception, show_diff=False, model=False)
-        expected_data = self._run_program(func_name, used_args, used_kwargs, used_inputs, prog, model=True)
-        #print(expected_data, file=sys.stderr) # Debug print
-        data = self._run_program(name_tested, used_args, used_kwargs, used_inputs, prog, model=False)
-        #print(data, file=sys.stderr) # Debug print
-        self._set_diff(MSG_OUTPUT_DIFF, data["output"], expected_data["output"])
-        if expected_data["exception"]:
-            self._raise_exception_with_feedback(expected_data["exception"], show_diff=True, model=True)
-        if data["exception"]:
-            self._raise_exception_with_feedback(data["exception"], show_diff=True, model=False)
-        self.test_case.iotester_data["feedback"] = _combine_feedback([
-            MSG_PYTHON_VERSION,
-            MSG_COLORS,
-            MSG_WHITESPACE,
-            self.name_tested,
-            self.desc,
-            self.diff,
-            self.used_inputs_and_params,
-        ])
-        # Get numbers (as strings) from both outputs
-        numbers = _get_numbers_from_string(data["output"])
-        expected_numbers = _get_numbers_from_string(expected_data["output"])
-        minus_check_indexes = []
-        for i in range(len(numbers)):
-            if numbers[i].startswith('-') != expected_numbers[i].startswith('-'):
-                # Whitespace minus check has to be performed for these numbers
-                minus_check_indexes.append(i)
-        # Compare outputs
-        stripped_output = _strip_string(
-            data["output"],
-            numbers,
-            self.settings["ignored_characters"],
-            strip_numbers=False,
-            strip_whitespace=False,
-            minus_check_indexes=minus_check_indexes,
-        )
-        expected_stripped_output = _strip_string(
-            expected_data["output"],
-            expected_numbers,
-            self.settings["ignored_characters"],
-            strip_numbers=False,
-            strip_whitespace=False,
-            minus_check_indexes=minus_check_indexes,
-        )
-        # Example:
-        # data["expected_output"] = "Numbers   are  0.00 and 82.\nThat's it."
-        # data["output"]          = "numbers   are -0.00 and 82.\nthat's it."
-        # expected_stripped_output = "Numbers   are  [iotester-minus-check] and [iotester-number]\nThats it"
-        # stripped_output          = "numbers   are [iotester-minus-check] and [iotester-number]\nthats it"
-        output, expected_output = _whitespace_minus_check_patch(
-            stripped_output.lower(),
-            expected_stripped_output.lower(),
-        )
-        # expected_output = "numbers   are  [iotester-minus-check] and [iotester-number]\nthats it"
-        # output          = "numbers   are  [iotester-minus-check] and [iotester-number]\nthats it"
-        self.test_case.assertEqual(output, expected_output)
-        self.test_case.iotester_data["feedback"] = _combine_feedback([
-            MSG_PYTHON_VERSION,
-            MSG_COLORS,
-            self.name_tested,
-            self.desc,
-            self.diff,
-            self.used_inputs_and_params,
-        ])
+        self._compare_whitespace(data, expected_data)
         # Return the data that was collected when running the two programs
         return data, expected_data
 
@@ -2172,18 +2312,9 @@ class IOTester:
         """
         Run the student program and test that nothing is printed.
         """
-        self._setup()
-        used_args = prog_args if prog else args
-        used_kwargs = prog_kwargs if prog else kwargs
-        used_inputs = prog_inputs if prog else inputs
-        name_tested = func_name
-        if not func_name:
-            name_tested = "main" if self.main_func_found else ""
-        self._set_name_tested(name_tested)
-        self._set_description(desc)
-        self._set_used_inputs_and_params(inputs, args, kwargs)
-        if self.prepare_exception:
-            self._raise_exception_with_feedback(self.prepare_exception, show_diff=False, model=False)
+        used_args, used_kwargs, used_inputs, name_tested = self._prepare_test(
+            func_name, args, kwargs, inputs, prog, prog_args, prog_kwargs, prog_inputs, desc,
+        )
         data = self._run_program(name_tested, used_args, used_kwargs, used_inputs, prog, model=False)
         #print(data, file=sys.stderr) # Debug print
         self._set_diff(MSG_OUTPUT_DIFF, data["output"], "")
@@ -2228,18 +2359,9 @@ class IOTester:
         Run the model program and the student program and compare the data in the file they create.
         The data in the two files has to be identical.
         """
-        self._setup()
-        used_args = prog_args if prog else args
-        used_kwargs = prog_kwargs if prog else kwargs
-        used_inputs = prog_inputs if prog else inputs
-        name_tested = func_name
-        if not func_name:
-            name_tested = "main" if self.main_func_found else ""
-        self._set_name_tested(name_tested)
-        self._set_description(desc)
-        self._set_used_inputs_and_params(inputs, args, kwargs)
-        if self.prepare_exception:
-            self._raise_exception_with_feedback(self.prepare_exception, show_diff=False, model=False)
+        used_args, used_kwargs, used_inputs, name_tested = self._prepare_test(
+            func_name, args, kwargs, inputs, prog, prog_args, prog_kwargs, prog_inputs, desc,
+        )
         expected_data = self._run_program(func_name, used_args, used_kwargs, used_inputs, prog, model=True)
         #print(expected_data, file=sys.stderr) # Debug print
         data = self._run_program(name_tested, used_args, used_kwargs, used_inputs, prog, model=False)
@@ -2325,18 +2447,9 @@ class IOTester:
         generator states. Used to test a function that sets random seed and to check that a program
         generates pseudo-random numbers the correct amount of times.
         """
-        self._setup()
-        used_args = prog_args if prog else args
-        used_kwargs = prog_kwargs if prog else kwargs
-        used_inputs = prog_inputs if prog else inputs
-        name_tested = func_name
-        if not func_name:
-            name_tested = "main" if self.main_func_found else ""
-        self._set_name_tested(name_tested)
-        self._set_description(desc)
-        self._set_used_inputs_and_params(inputs, args, kwargs)
-        if self.prepare_exception:
-            self._raise_exception_with_feedback(self.prepare_exception, show_diff=False, model=False)
+        used_args, used_kwargs, used_inputs, name_tested = self._prepare_test(
+            func_name, args, kwargs, inputs, prog, prog_args, prog_kwargs, prog_inputs, desc,
+        )
         expected_data = self._run_program(func_name, used_args, used_kwargs, used_inputs, prog, model=True)
         #print(expected_data, file=sys.stderr) # Debug print
         data = self._run_program(name_tested, used_args, used_kwargs, used_inputs, prog, model=False)
@@ -2370,6 +2483,17 @@ class IOTester:
         Parameter op should be one of the following strings: '>', '<', '>=', '<=', '=='
         NOTE: Breaks if using rpyc and the student's Python module contains custom classes.
         """
+        ops_msgs = {
+            ">": (operator.gt, MSG_FUNCS_AMOUNT_GT),
+            "<": (operator.lt, MSG_FUNCS_AMOUNT_LT),
+            ">=": (operator.ge, MSG_FUNCS_AMOUNT_GE),
+            "<=": (operator.le, MSG_FUNCS_AMOUNT_LE),
+            "==": (operator.eq, MSG_FUNCS_AMOUNT_EQ),
+        }
+        # Check op before running the student program instead of failing with a KeyError afterwards
+        assert op in ops_msgs, (
+            "Parameter op should be one of the following strings: '>', '<', '>=', '<=', '=='"
+        )
         self._setup()
         self._set_description(desc)
         if self.prepare_exception:
@@ -2378,19 +2502,15 @@ class IOTester:
         #print(data, file=sys.stderr) # Debug print
         if data["exception"]:
             self._raise_exception_with_feedback(data["exception"], show_diff=False, model=False)
-        ops_msgs = {
-            ">": (operator.gt, MSG_FUNCS_AMOUNT_GT),
-            "<": (operator.lt, MSG_FUNCS_AMOUNT_LT),
-            ">=": (operator.ge, MSG_FUNCS_AMOUNT_GE),
-            "<=": (operator.le, MSG_FUNCS_AMOUNT_LE),
-            "==": (operator.eq, MSG_FUNCS_AMOUNT_EQ),
-        }
-        funcs = [o for o in inspect.getmembers(data["module"]) if inspect.isfunction(o[1])]
-        result = ops_msgs[op][0](len(funcs), amount)
-        msg_funcs_amount = ops_msgs[op][1].format(amount, len(funcs))
-        funcs_str = ""
-        for name, func in funcs:
-            funcs_str += '\n' + name
+        # Sorted by name like inspect.getmembers, but without calling getattr for every name in the module
+        funcs = [
+            (name, value) for name, value in sorted(vars(data["module"]).items())
+            if inspect.isfunction(value)
+        ]
+        op_func, msg_funcs_amount = ops_msgs[op]
+        result = op_func(len(funcs), amount)
+        msg_funcs_amount = msg_funcs_amount.format(amount, len(funcs))
+        funcs_str = ''.join('\n' + name for name, func in funcs)
         msg_funcs = MSG_FUNCS_FOUND.format(funcs_str)
         self.test_case.iotester_data["feedback"] = _combine_feedback([
             MSG_PYTHON_VERSION,
@@ -2439,21 +2559,10 @@ class IOTester:
         expected_class_attrs = expected_data["class"].__dict__
         class_attrs = data["class"].__dict__
 
-        def get_attrs_str(attrs_dict):
-            attrs_list = []
-            keys = sorted(attrs_dict.keys())
-            for key in keys:
-                value = attrs_dict[key]
-                if key.startswith("_" + class_name + "__"):
-                    key = key[len(class_name) + 1:]
-                attrs_list.append(key + " : " + repr(type(value)))
-            string = '\n'.join(attrs_list)
-            return string
-
         if "object_attrs" in checks:
             # Check required object attributes exist and that they are of the correct type
-            object_attrs_str = get_attrs_str(object_attrs)
-            expected_object_attrs_str = get_attrs_str(expected_object_attrs)
+            object_attrs_str = _attr_types_to_str(object_attrs, class_name)
+            expected_object_attrs_str = _attr_types_to_str(expected_object_attrs, class_name)
             self._set_description(MSG_INIT_DESC.format(class_name))
             self._set_name_tested(func_name)
             self._set_used_inputs_and_params(inputs=[], args=args, kwargs=kwargs)
@@ -2467,7 +2576,7 @@ class IOTester:
                 self.diff,
                 self.used_inputs_and_params,
             ])
-            self.test_case.assertTrue(all([key in object_attrs for key in expected_object_attrs]))
+            self.test_case.assertTrue(expected_object_attrs.keys() <= object_attrs.keys())
             self.test_case.iotester_data["feedback"] = _combine_feedback([
                 MSG_PYTHON_VERSION,
                 MSG_COLORS,
@@ -2477,13 +2586,16 @@ class IOTester:
                 self.diff,
                 self.used_inputs_and_params,
             ])
-            for key in expected_object_attrs:
-                # Calling repr() below allows items to be from different modules
-                self.test_case.assertEqual(repr(type(object_attrs[key])), repr(type(expected_object_attrs[key])))
+            for key, expected_value in expected_object_attrs.items():
+                value_type, expected_type = type(object_attrs[key]), type(expected_value)
+                # Calling repr() below allows items to be from different modules.
+                # Identical types, such as built-in types, are equal without building the strings.
+                if value_type is not expected_type:
+                    self.test_case.assertEqual(repr(value_type), repr(expected_type))
         if "class_attrs" in checks:
             # Check required methods, functions and variables exist and that they are of the correct type
-            class_attrs_str = get_attrs_str(class_attrs)
-            expected_class_attrs_str = get_attrs_str(expected_class_attrs)
+            class_attrs_str = _attr_types_to_str(class_attrs, class_name)
+            expected_class_attrs_str = _attr_types_to_str(expected_class_attrs, class_name)
             self._set_description(desc)
             self._set_diff(MSG_CLASS_ATTRS_DIFF, class_attrs_str, expected_class_attrs_str, hide_newlines=True)
             self.test_case.iotester_data["feedback"] = _combine_feedback([
@@ -2494,7 +2606,7 @@ class IOTester:
                 self.desc,
                 self.diff,
             ])
-            self.test_case.assertTrue(all([key in class_attrs for key in expected_class_attrs]))
+            self.test_case.assertTrue(expected_class_attrs.keys() <= class_attrs.keys())
             self.test_case.iotester_data["feedback"] = _combine_feedback([
                 MSG_PYTHON_VERSION,
                 MSG_COLORS,
@@ -2503,32 +2615,19 @@ class IOTester:
                 self.desc,
                 self.diff,
             ])
-            for key in expected_class_attrs:
-                # Calling repr() below allows items to be from different modules
-                self.test_case.assertEqual(repr(type(class_attrs[key])), repr(type(expected_class_attrs[key])))
-
-        def get_extras(student_dict, model_dict):
-            extra_list = []
-            extra_str = ""
-            student_keys = sorted(student_dict.keys())
-            model_keys = sorted(model_dict.keys())
-            for key in student_dict:
-                if key not in model_keys:
-                    extra_list.append(key)
-            for key in extra_list:
-                value = student_dict[key]
-                if key.startswith("_" + class_name + "__"):
-                    key = key[len(class_name) + 1:]
-                extra_str += "\n{:s} : {:s}".format(repr(key), repr(type(value)))
-            extra_str = _escape_html_chars(extra_str)
-            return extra_list, extra_str
+            for key, expected_value in expected_class_attrs.items():
+                value_type, expected_type = type(class_attrs[key]), type(expected_value)
+                # Calling repr() below allows items to be from different modules.
+                # Identical types, such as built-in types, are equal without building the strings.
+                if value_type is not expected_type:
+                    self.test_case.assertEqual(repr(value_type), repr(expected_type))
 
         if "no_extra_object_attrs" in checks:
             # Check that no extra object attributes are found
             self._set_description(MSG_INIT_DESC.format(class_name))
             self._set_name_tested(func_name)
             self._set_used_inputs_and_params(inputs=[], args=args, kwargs=kwargs)
-            extra_object_attrs_list, extra_object_attrs_str = get_extras(object_attrs, expected_object_attrs)
+            extra_object_attrs_list, extra_object_attrs_str = _get_extra_attrs(object_attrs, expected_object_attrs, class_name)
             self.test_case.iotester_data["feedback"] = _combine_feedback([
                 MSG_PYTHON_VERSION,
                 self.name_tested,
@@ -2540,7 +2639,7 @@ class IOTester:
         if "no_extra_class_attrs" in checks:
             # Check that no extra methods, functions or variables are found
             self._set_description(desc)
-            extra_class_attrs_list, extra_class_attrs_str = get_extras(class_attrs, expected_class_attrs)
+            extra_class_attrs_list, extra_class_attrs_str = _get_extra_attrs(class_attrs, expected_class_attrs, class_name)
             self.test_case.iotester_data["feedback"] = _combine_feedback([
                 MSG_PYTHON_VERSION,
                 MSG_CLASS_NAME.format(class_name),
@@ -2606,19 +2705,8 @@ class IOTester:
         expected_object_attrs = expected_data["return_value"].__dict__
         object_attrs = data["return_value"].__dict__
 
-        def get_attrs_str(attrs_dict):
-            attrs_list = []
-            keys = sorted(attrs_dict.keys())
-            for key in keys:
-                value = attrs_dict[key]
-                if key.startswith("_" + class_name + "__"):
-                    key = key[len(class_name) + 1:]
-                attrs_list.append(key + " = " + repr(value))
-            string = '\n'.join(attrs_list)
-            return string
-
-        object_attrs_str = get_attrs_str(object_attrs)
-        expected_object_attrs_str = get_attrs_str(expected_object_attrs)
+        object_attrs_str = _attr_values_to_str(object_attrs, class_name)
+        expected_object_attrs_str = _attr_values_to_str(expected_object_attrs, class_name)
 
         self._set_diff(MSG_OBJECT_ATTRS_DIFF, object_attrs_str, expected_object_attrs_str, hide_newlines=True)
         self.test_case.iotester_data["feedback"] = _combine_feedback([
@@ -2630,7 +2718,7 @@ class IOTester:
             self.diff,
             self.used_inputs_and_params,
         ])
-        self.test_case.assertTrue(all([key in object_attrs for key in expected_object_attrs]))
+        self.test_case.assertTrue(expected_object_attrs.keys() <= object_attrs.keys())
 
         # Check required object attributes have correct values
         for key in expected_object_attrs:
@@ -2669,16 +2757,6 @@ class IOTester:
         return data["return_value"], expected_data["return_value"]
 
 
-    def _preorder(self, node):
-        if node.__class__ == ast.Call:
-            if hasattr(node.func, "attr") and node.func.attr == "__str__":
-                if not self.str_call_test_result:
-                    self.str_call_test_result = True
-                    return
-        for child in ast.iter_child_nodes(node):
-            self._preorder(child)
-
-
     def class_str_call_test(self, object_name):
         """
         Test that an object's __str__() method is not called directly,
@@ -2688,11 +2766,22 @@ class IOTester:
         self.str_call_test_result = False
         if self.prepare_exception:
             self._raise_exception_with_feedback(self.prepare_exception, show_diff=False, model=False)
-        with open(self.module_to_test + ".py") as f:
-            # UnicodeDecodeError and SyntaxError already checked in prepare
-            tree = ast.parse(f.read())
-        for child in ast.iter_child_nodes(tree):
-            self._preorder(child)
+        path = self.module_to_test + ".py"
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        if key in _str_call_cache:
+            # The file has already been parsed and checked
+            self.str_call_test_result = _str_call_cache[key]
+        else:
+            with open(path) as f:
+                # UnicodeDecodeError and SyntaxError already checked in prepare
+                tree = ast.parse(f.read())
+            # Iterate over all the nodes without recursion and stop at the first __str__() call
+            for node in ast.walk(tree):
+                if node.__class__ is ast.Call and getattr(node.func, "attr", None) == "__str__":
+                    self.str_call_test_result = True
+                    break
+            _str_call_cache[key] = self.str_call_test_result
         if self.str_call_test_result:
             msg_str_call_test = MSG_STR_CALL_TEST.format(object_name, object_name)
             self.test_case.iotester_data["feedback"] = _combine_feedback([
@@ -2742,10 +2831,7 @@ class IOTester:
                 try:
                     with self._captured_output(inputs) as out:
                         # Built-in __import__() and open() should be overridden for both model and student
-                        self._override_builtin_import(model=True)
-                        self._override_builtin_import(model=False)
-                        self._override_builtin_open(model=True)
-                        self._override_builtin_open(model=False)
+                        self._override_model_and_student_builtins()
                         timeout = self.settings["max_exec_time"]
                         if remote.conn:
                             # Update rpyc timeout so that it matches result_or_timeout
@@ -2763,27 +2849,20 @@ class IOTester:
                             e.__traceback__
                         )
                     ).rstrip()
-                    tb = StringIO(tb_str)
 
                     exercise_string = '  File "' + exercise_path + '/'
-                    exercise_line_found = False
-                    for line in tb:
-                        if line.startswith(exercise_string):
-                            exercise_line_found = True
-                            break
-                    if exercise_line_found:
-                        assert_line = tb.readline().strip()
+                    pos = _find_line(tb_str, exercise_string, 0)
+                    if pos != -1:
+                        # The assert statement is on the line after the exercise file line
+                        assert_line, pos = _read_line(tb_str, _read_line(tb_str, pos)[1])
+                        assert_line = assert_line.strip()
                     else:
                         assert_line = tb_str
                     msg_assert_line = MSG_ASSERT_LINE.format(_prepend_newline(assert_line))
 
                     submission_string = '  File "' + student_path + '/'
-                    submission_line_found = False
-                    for line in tb: # Continue reading the traceback
-                        if line.startswith(submission_string):
-                            submission_line_found = True
-                            break
-                    if submission_line_found:
+                    # Continue searching the traceback after the assert statement
+                    if pos != -1 and _find_line(tb_str, submission_string, pos) != -1:
                         # AssertionError was raised by student code
                         self._raise_exception_with_feedback(e, show_diff=False, model=False)
 
@@ -1,3 +1,4 @@
+import builtins
 import importlib
 import os
 import sys
@@ -22,6 +23,28 @@ def run_server():
     OneShotServer(SlaveService, socket_path=sock_path).start()
 
 
+def unload_modules(previous_modules):
+    """
+    Remove modules that are not in previous_modules from sys.modules and return their names.
+    Called from the grader process so that unloading the modules of the student process takes a single request.
+    """
+    modules_to_unload = tuple(sys.modules.keys() - previous_modules)
+    for m in modules_to_unload:
+        del sys.modules[m]
+    return modules_to_unload
+
+
+def override_builtins(import_func, open_func, input_func=None):
+    """
+    Replace the built-in __import__(), open() and, if given, input() functions.
+    Called from the grader process so that overriding the built-in functions of the student process takes a single request.
+    """
+    builtins.__import__ = import_func
+    builtins.open = open_func
+    if input_func is not None:
+        builtins.input = input_func
+
+
 @contextmanager
 def manage_server(pid):
     global conn
@@ -7,6 +7,11 @@ import re
 # TODO save traceback objects during tests and use the std lib traceback module
 # then a lot of code in here can probably be dropped
 
+RECURSION_ERROR_MESSAGE = "RecursionError: maximum recursion depth exceeded"
+# Matches the whole line containing the RecursionError message, compiled once instead of for every test result
+_RECURSION_ERROR_RE = re.compile('^' + re.escape(RECURSION_ERROR_MESSAGE) + '.*$', re.MULTILINE)
+
+
 def _iter_redacted_lines(lines, remove_lines, replacement_string):
     """
     Return an iterator over lines that are not part of line chunks specified by remove_lines.
@@ -135,6 +140,12 @@ def strip_irrelevant_traceback_lines(output, strip_exercise_tb):
         is_matching = False
         match = []
         matches = []
+        # Index of the last line containing a relevant string.
+        # Computed once so that checking for relevant lines below an irrelevant line does not rejoin the remaining lines.
+        last_relevant_lineno = -1
+        for lineno, line in enumerate(lines):
+            if any(s in line for s in relevant_tb_strings):
+                last_relevant_lineno = lineno
 
         for lineno, line in enumerate(lines):
             if is_matching:
@@ -149,7 +160,7 @@ def strip_irrelevant_traceback_lines(output, strip_exercise_tb):
             else:
                 found_irrelevant_tb_string_above_relevant = (
                     any([s in line for s in irrelevant_tb_strings]) and
-                    any([s in ''.join(lines[lineno:]) for s in relevant_tb_strings])
+                    lineno <= last_relevant_lineno
                 )
                 if found_irrelevant_tb_string_above_relevant:
                     # Found a irrelevant traceback line above relevant lines, start accumulating lines to be stripped
@@ -172,12 +183,12 @@ def clean_feedback(result_groups, config):
         for result in group["testResults"]:
 
             if result["status"] == "error":
-                # Shorten long RecursionError traceback in testOutput but leave it in fullTestOutput
-                recursion_error_message = "RecursionError: maximum recursion depth exceeded"
-                search_pattern = re.compile('^' + re.escape(recursion_error_message) + '.*$', re.MULTILINE)
-                match = re.search(search_pattern, result["testOutput"])
-                if match:
-                    result["testOutput"] = match.group(0)
+                # Shorten long RecursionError traceback in testOutput but leave it in fullTestOutput.
+                # The substring check skips the line-anchored regex search for all other errors.
+                if RECURSION_ERROR_MESSAGE in result["testOutput"]:
+                    match = _RECURSION_ERROR_RE.search(result["testOutput"])
+                    if match:
+                        result["testOutput"] = match.group(0)
                 # Strip traceback lines that are irrelevant to the student
                 result["testOutput"] = strip_irrelevant_traceback_lines(result["testOutput"], strip_exercise_tb=True)
                 result["fullTestOutput"] = strip_irrelevant_traceback_lines(result["fullTestOutput"], strip_exercise_tb=False)
@@ -2,6 +2,7 @@
 Render "Grading feedback" JSON schema objects into HTML using Jinja2 templates.
 """
 import argparse
+import functools
 import json
 import os
 import sys
@@ -15,8 +16,22 @@ from graderutils import schemaobjects
 points_file = "/feedback/points"
 
 
+def _make_environment(loader):
+    return jinja2.Environment(loader=loader, trim_blocks=True, lstrip_blocks=True)
+
+
+@functools.lru_cache(maxsize=None)
+def _package_environment():
+    """
+    Return the environment for the package templates.
+    It is shared so that Jinja compiles the default templates only once.
+    """
+    package_loader = jinja2.PackageLoader("graderutils_format", "templates")
+    return _make_environment(package_loader)
+
+
 def _load_template(loader, name):
-    return jinja2.Environment(loader=loader, trim_blocks=True, lstrip_blocks=True).get_template(name)
+    return _make_environment(loader).get_template(name)
 
 
 def _load_template_file(template_paths, name):
@@ -25,8 +40,7 @@ def _load_template_file(template_paths, name):
 
 
 def _load_package_template(name):
-    package_loader = jinja2.PackageLoader("graderutils_format", "templates")
-    return _load_template(package_loader, name)
+    return _package_environment().get_template(name)
 
 
 def grading_data_to_html(grading_data, extends_base=False, grader_container=False):